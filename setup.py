@@ -36,8 +36,7 @@ setup(
         "markdown",
         "markslack",
         "Pillow",
-        "slackclient>=1,<2",
-        "slacker",
+        "requests",
         "tqdm",
     ],
 )
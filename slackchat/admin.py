@@ -1,13 +1,14 @@
 import json
 from django.contrib import admin
+from django.db import transaction
 from foreignform.mixins import ForeignFormAdminMixin
 
-from .serializers import ChannelSerializer
+from .notifications import request_republish, request_unpublish
+from .snapshots import invalidate_channel
 
 from .celery import (
     post_webhook,
-    post_webhook_republish,
-    post_webhook_unpublish,
+    replay_dead_letters,
     update_users,
 )
 from .models import (
@@ -16,6 +17,7 @@ from .models import (
     Channel,
     ChatType,
     CustomContentTemplate,
+    DeadLetter,
     KeywordArgument,
     Message,
     Reaction,
@@ -85,22 +87,21 @@ class ChannelAdmin(ForeignFormAdminMixin, admin.ModelAdmin):
         self.message_user(request, "Requested channels update chat page!")
 
     def request_chats_republish(self, request, queryset):
-        for channel in queryset:
-            post_webhook_republish.delay(
-                ChannelSerializer(channel).data, channel.chat_type.name
-            )
+        for channel in queryset.select_related("chat_type"):
+            request_republish(channel)
         self.message_user(request, "Requested channels republish chat page!")
 
     def request_chats_unpublish(self, request, queryset):
-        for channel in queryset:
-            post_webhook_unpublish.delay(
-                ChannelSerializer(channel).data, channel.chat_type.name
-            )
+        for channel in queryset.select_related("chat_type"):
+            request_unpublish(channel)
         self.message_user(request, "Requested channels unpublish chat page!")
 
     def close_live_chats(self, request, queryset):
         queryset.update(live=False)
         for channel in queryset:
+            transaction.on_commit(
+                lambda pk=channel.pk: invalidate_channel(pk)
+            )
             post_webhook.delay(channel.id.hex, channel.chat_type.name)
         self.message_user(
             request,
@@ -117,8 +118,40 @@ class UserAdmin(admin.ModelAdmin):
         self.message_user(request, "Updated user profiles!")
 
 
+class DeadLetterInline(admin.TabularInline):
+    model = DeadLetter
+    fields = ("created", "payload", "error", "attempts")
+    readonly_fields = fields
+    extra = 0
+    can_delete = True
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class WebhookAdmin(admin.ModelAdmin):
     fields = ("endpoint", "verified")
+    readonly_fields = ("failures", "last_success", "last_failure")
+    list_display = (
+        "endpoint",
+        "verified",
+        "circuit_open",
+        "failures",
+        "last_success",
+        "last_failure",
+    )
+    inlines = [DeadLetterInline]
+    actions = ["replay_failed_deliveries"]
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return self.fields
+        return self.fields + self.readonly_fields
+
+    def replay_failed_deliveries(self, request, queryset):
+        for webhook in queryset:
+            replay_dead_letters.delay(webhook.pk)
+        self.message_user(request, "Requested failed deliveries replay!")
 
 
 class MessageAdmin(admin.ModelAdmin):
@@ -0,0 +1,160 @@
+import hashlib
+import os
+from io import BytesIO
+
+import requests
+from django.core.files.base import ContentFile
+from PIL import Image, features
+from rest_framework.settings import api_settings
+from slackchat.conf import settings
+
+# Seconds to wait for Slack to send an avatar
+TIMEOUT = 30
+
+EXTENSIONS = {"jpeg": "jpg", "png": "png", "gif": "gif", "webp": "webp"}
+
+
+def get_avatar_hash(profile):
+    """
+    Return a key that changes whenever a profile's avatar does, or
+    None if the profile has no avatar.
+    """
+    url = profile.get("image_192")
+    if not url:
+        return None
+    # Slack hashes avatars itself. Without that, the URL will do.
+    return profile.get("avatar_hash") or hashlib.sha1(
+        url.encode("utf-8")
+    ).hexdigest()
+
+
+def avatar_changed(user, profile):
+    avatar_hash = get_avatar_hash(profile)
+    return bool(avatar_hash) and (
+        avatar_hash != user.avatar_hash or not user.image
+    )
+
+
+def download(url):
+    response = requests.get(url, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def get_formats(original):
+    """Formats to make variants in: the original's, and WebP."""
+    formats = [original if original in EXTENSIONS else "jpeg"]
+    if "webp" not in formats and features.check("webp"):
+        formats.append("webp")
+    return formats
+
+
+def encode(image, format):
+    if format == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, format=format.upper(), quality=85)
+    return buffer.getvalue()
+
+
+def get_extension(format):
+    """The file extension Pillow uses for an image format."""
+    if format in EXTENSIONS:
+        return EXTENSIONS[format]
+    for extension, name in Image.registered_extensions().items():
+        if name.lower() == format:
+            return extension.lstrip(".")
+    return format
+
+
+def store(user, image_hash, filename, get_data):
+    """
+    Save a file under the avatar path for its content hash, unless a
+    file of that name is there already. As names are content hashes,
+    that file is the same one, even if it's another user's avatar.
+    Returns the stored name.
+    """
+    storage = user.image.storage
+    name = os.path.join(settings.AVATAR_UPLOAD_TO, image_hash[:2], filename)
+    if not storage.exists(name):
+        name = storage.save(name, ContentFile(get_data()))
+    return name
+
+
+def store_avatar(user, data):
+    """
+    Store an avatar under the hash of its contents, with resized
+    variants. Returns False if it's the avatar the user already has.
+    """
+    image_hash = hashlib.sha1(data).hexdigest()
+    if image_hash == user.image_hash and user.image:
+        return False
+
+    image = Image.open(BytesIO(data))
+    original = (image.format or "jpeg").lower()
+    image.load()
+
+    user.image.name = store(
+        user,
+        image_hash,
+        "{}.{}".format(image_hash, get_extension(original)),
+        lambda: data,
+    )
+
+    variants = {}
+    for format in get_formats(original):
+        variants[format] = {}
+        for width in settings.AVATAR_SIZES:
+            if width > image.width:
+                continue
+
+            def resize(width=width, format=format):
+                resized = image.copy()
+                resized.thumbnail((width, width), Image.LANCZOS)
+                return encode(resized, format)
+
+            variants[format][str(width)] = store(
+                user,
+                image_hash,
+                "{}-{}.{}".format(image_hash, width, get_extension(format)),
+                resize,
+            )
+
+    user.image_hash = image_hash
+    user.image_variants = variants
+    return True
+
+
+def save_avatar(user, profile, save=True):
+    """
+    Download a profile's avatar to the user's image, unless it's the
+    one they already have. Returns whether the image changed.
+    """
+    if not avatar_changed(user, profile):
+        return False
+    changed = store_avatar(user, download(profile["image_192"]))
+    user.avatar_hash = get_avatar_hash(profile)
+    if save:
+        user.save()
+    return changed
+
+
+def get_srcsets(user):
+    """
+    Return a srcset for each format the user's avatar was resized to,
+    like {"webp": "/media/...-48.webp 48w, /media/...-96.webp 96w"}.
+    """
+    storage = user.image.storage
+    srcsets = {}
+    for format, widths in (user.image_variants or {}).items():
+        candidates = []
+        for width, name in sorted(
+            widths.items(), key=lambda item: int(item[0])
+        ):
+            # As the image field serializes without a request
+            if api_settings.UPLOADED_FILES_USE_URL:
+                name = storage.url(name)
+            candidates.append("{} {}w".format(name, width))
+        if candidates:
+            srcsets[format] = ", ".join(candidates)
+    return srcsets
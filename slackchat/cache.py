@@ -0,0 +1,39 @@
+import time
+
+from django.core.cache import caches
+from slackchat.conf import settings
+
+
+def get_cache():
+    """Return the cache backend slackchat shares between workers."""
+    return caches[settings.CACHE]
+
+
+def make_key(*parts):
+    return "slackchat:{}".format(":".join(str(part) for part in parts))
+
+
+def get_version(name):
+    """
+    Return the current version of a named piece of shared state.
+
+    Versions start from the current time in milliseconds so a version
+    evicted from the cache never comes back with an old value.
+    """
+    cache = get_cache()
+    key = make_key("version", name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000))
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    """Invalidate everything built from the named state."""
+    cache = get_cache()
+    key = make_key("version", name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        return get_version(name)
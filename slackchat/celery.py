@@ -1,9 +1,17 @@
 # flake8: noqa
-from slackchat.tasks.channel import create_private_channel
+from slackchat.tasks.channel import (
+    create_private_channel,
+    prune_channel_changes,
+)
+from slackchat.tasks.event import process_event, prune_processed_events
+from slackchat.tasks.message import reserialize_messages
 from slackchat.tasks.user import update_users
 from slackchat.tasks.webhook import (
+    flush_webhook_batch,
     post_webhook,
     post_webhook_unpublish,
     post_webhook_republish,
+    replay_dead_letters,
+    retry_webhook,
     verify_webhook,
 )
@@ -0,0 +1,136 @@
+from datetime import timedelta
+
+from django.db.models import Max, Min
+from django.utils import timezone
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.models import Channel, ChannelChange, Message
+
+
+def record_change(channel_pk, timestamp, deleted=False):
+    """Log a message change for renderers polling the channel."""
+    # The channel may have been deleted along with the message
+    if not Channel.objects.filter(pk=channel_pk).exists():
+        return
+
+    ChannelChange.objects.create(
+        channel_id=channel_pk, timestamp=timestamp, deleted=deleted
+    )
+
+    if get_cache().add(make_key("changes-prune"), True, settings.CHANGES_TTL):
+        from slackchat.celery import prune_channel_changes
+
+        prune_channel_changes.delay()
+
+
+def get_settled_before():
+    """
+    Changes logged before this time are taken to have committed.
+
+    Change ids are allocated before their transaction commits, so a
+    change can become visible after one with a higher id. Cursors
+    don't move past changes younger than CHANGES_LAG seconds, so a
+    late commit within that window is still picked up.
+    """
+    return timezone.now() - timedelta(seconds=settings.CHANGES_LAG)
+
+
+def get_pruned_through():
+    """Return the highest change id that may have been pruned."""
+    pruned = get_cache().get(make_key("changes-pruned"))
+    if pruned is None:
+        # Forgotten by the cache. Assume all before the oldest is gone.
+        oldest = ChannelChange.objects.aggregate(oldest=Min("id"))["oldest"]
+        pruned = oldest - 1 if oldest else 0
+    return pruned
+
+
+def get_changes(channel_pk, since):
+    """
+    Return the messages changed in a channel after a cursor.
+
+    Multiple changes to a message collapse into its latest state.
+    Deleted messages are returned as tombstones.
+
+    If changes after the cursor have been pruned, "reset" is True and
+    the renderer should reload the whole channel.
+    """
+    if since < get_pruned_through():
+        return {
+            "cursor": get_cursor(channel_pk),
+            "reset": True,
+            "messages": [],
+            "deleted": [],
+        }
+
+    changes = (
+        ChannelChange.objects.filter(channel_id=channel_pk, id__gt=since)
+        .order_by("id")
+        .values_list("id", "timestamp", "deleted", "created")
+    )
+
+    settled = get_settled_before()
+    cursor = since
+    unsettled = False
+    latest = {}
+    for id, timestamp, deleted, created in changes:
+        # Recent changes are sent, but sent again next time too, in
+        # case one before them hasn't committed yet.
+        unsettled = unsettled or created > settled
+        if not unsettled:
+            cursor = id
+        latest[timestamp] = deleted
+
+    changed = [ts for ts, deleted in latest.items() if not deleted]
+    messages = dict(
+        Message.objects.filter(
+            channel_id=channel_pk, timestamp__in=changed
+        ).values_list("timestamp", "serialized")
+    )
+
+    return {
+        "cursor": cursor,
+        "reset": False,
+        "messages": [
+            messages[ts] for ts in sorted(latest) if ts in messages
+        ],
+        "deleted": [
+            {"timestamp": ts} for ts in sorted(latest) if ts not in messages
+        ],
+    }
+
+
+def get_cursor(channel_pk):
+    """
+    Return a cursor for a channel's latest settled change.
+
+    It's never below the pruned mark, even for a channel with no
+    changes left, so a quiet channel isn't reset on every poll.
+    """
+    latest = (
+        ChannelChange.objects.filter(
+            channel_id=channel_pk, created__lte=get_settled_before()
+        )
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+        or 0
+    )
+    return max(latest, get_pruned_through())
+
+
+def prune():
+    """Delete changes older than the retention window."""
+    expired = ChannelChange.objects.filter(
+        created__lt=timezone.now() - timedelta(seconds=settings.CHANGES_TTL)
+    )
+    pruned = expired.aggregate(pruned=Max("id"))["pruned"]
+    if pruned is None:
+        return 0
+
+    # Remembered before deleting, so cursors are never silently stale
+    cache = get_cache()
+    key = make_key("changes-pruned")
+    cache.set(key, max(pruned, cache.get(key, 0)), None)
+    deleted, _ = expired.filter(id__lte=pruned).delete()
+    return deleted
@@ -10,6 +10,38 @@ Settings.CMS_TOKEN = getattr(
     project_settings, "SLACKCHAT_CMS_TOKEN", "%032x" % random.getrandbits(128)
 )
 
+Settings.WEBHOOK_TIMEOUT = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_TIMEOUT", 10
+)
+
+Settings.WEBHOOK_WORKERS = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_WORKERS", 8
+)
+
+Settings.WEBHOOK_RETRIES = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_RETRIES", 5
+)
+
+Settings.WEBHOOK_RETRY_BACKOFF = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_RETRY_BACKOFF", 10
+)
+
+Settings.WEBHOOK_BREAKER_THRESHOLD = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_BREAKER_THRESHOLD", 5
+)
+
+Settings.WEBHOOK_BREAKER_COOLDOWN = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_BREAKER_COOLDOWN", 60 * 5
+)
+
+Settings.WEBHOOK_BATCH_WINDOW = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_BATCH_WINDOW", 0
+)
+
+Settings.WEBHOOK_BATCH_SIZE = getattr(
+    project_settings, "SLACKCHAT_WEBHOOK_BATCH_SIZE", 50
+)
+
 Settings.PUBLISH_ROOT = getattr(
     project_settings,
     "SLACKCHAT_PUBLISH_ROOT",
@@ -38,6 +70,82 @@ Settings.SLACK_LOGGER = getattr(
     project_settings, "SLACKCHAT_SLACK_LOGGER", "slackchat"
 )
 
+Settings.ASYNC_EVENTS = getattr(
+    project_settings, "SLACKCHAT_ASYNC_EVENTS", False
+)
+
+Settings.EVENT_DEDUPE_TTL = getattr(
+    project_settings, "SLACKCHAT_EVENT_DEDUPE_TTL", 60 * 60
+)
+
+Settings.LOOKUP_CACHE_TTL = getattr(
+    project_settings, "SLACKCHAT_LOOKUP_CACHE_TTL", 60 * 60 * 24
+)
+
+Settings.ROSTER_TTL = getattr(
+    project_settings, "SLACKCHAT_ROSTER_TTL", 60 * 60
+)
+
+Settings.PENDING_EVENTS_TTL = getattr(
+    project_settings, "SLACKCHAT_PENDING_EVENTS_TTL", 60 * 5
+)
+
+Settings.PENDING_EVENTS_MAX = getattr(
+    project_settings, "SLACKCHAT_PENDING_EVENTS_MAX", 100
+)
+
+Settings.RESERIALIZE_DEBOUNCE = getattr(
+    project_settings, "SLACKCHAT_RESERIALIZE_DEBOUNCE", 0
+)
+
+Settings.SNAPSHOT_TTL = getattr(
+    project_settings, "SLACKCHAT_SNAPSHOT_TTL", 60 * 60 * 24
+)
+
+Settings.CHANGES_TTL = getattr(
+    project_settings, "SLACKCHAT_CHANGES_TTL", 60 * 60 * 24
+)
+
+Settings.CHANGES_LAG = getattr(project_settings, "SLACKCHAT_CHANGES_LAG", 5)
+
+Settings.STREAMING_THRESHOLD = getattr(
+    project_settings, "SLACKCHAT_STREAMING_THRESHOLD", None
+)
+
+Settings.STREAMING_CHUNK_SIZE = getattr(
+    project_settings, "SLACKCHAT_STREAMING_CHUNK_SIZE", 500
+)
+
+Settings.MARKDOWN_CACHE_SIZE = getattr(
+    project_settings, "SLACKCHAT_MARKDOWN_CACHE_SIZE", 1024
+)
+
+Settings.MARKDOWN_SHARED_CACHE = getattr(
+    project_settings, "SLACKCHAT_MARKDOWN_SHARED_CACHE", False
+)
+
+Settings.MARKDOWN_CACHE_TTL = getattr(
+    project_settings, "SLACKCHAT_MARKDOWN_CACHE_TTL", 60 * 60 * 24
+)
+
+Settings.FAST_SERIALIZERS = getattr(
+    project_settings, "SLACKCHAT_FAST_SERIALIZERS", False
+)
+
+Settings.JSON_RENDERER = getattr(
+    project_settings,
+    "SLACKCHAT_JSON_RENDERER",
+    "slackchat.renderers.FastJSONRenderer",
+)
+
+Settings.PRECOMPRESS = getattr(project_settings, "SLACKCHAT_PRECOMPRESS", True)
+
+Settings.LIVE_MAX_AGE = getattr(project_settings, "SLACKCHAT_LIVE_MAX_AGE", 5)
+
+Settings.MAX_AGE = getattr(project_settings, "SLACKCHAT_MAX_AGE", 60 * 5)
+
+Settings.CACHE = getattr(project_settings, "SLACKCHAT_CACHE", "default")
+
 Settings.WEBHOOK_VERIFICATION_TOKEN = getattr(
     project_settings, "SLACK_WEBHOOK_VERIFICATION_TOKEN", "slackchat"
 )
@@ -79,5 +187,13 @@ Settings.USER_IMAGE_UPLOAD_TO = getattr(
     default_user_image_upload_to,
 )
 
+Settings.AVATAR_UPLOAD_TO = getattr(
+    project_settings, "SLACKCHAT_AVATAR_UPLOAD_TO", "slackchat/avatars/"
+)
+
+Settings.AVATAR_SIZES = getattr(
+    project_settings, "SLACKCHAT_AVATAR_SIZES", (48, 96, 192)
+)
+
 
 settings = Settings
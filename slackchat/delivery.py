@@ -0,0 +1,256 @@
+import json
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import requests
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.utils import log_event
+
+# Longest wait, in seconds, between retries to one endpoint
+MAX_BACKOFF = 60 * 10
+
+# One session per endpoint, so connections to each receiver are kept
+# alive between deliveries made by this process.
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(endpoint):
+    with _sessions_lock:
+        session = _sessions.get(endpoint)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=settings.WEBHOOK_WORKERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[endpoint] = session
+        return session
+
+
+def get_webhooks():
+    from slackchat.models import Webhook
+
+    return list(
+        Webhook.objects.filter(verified=True).only(
+            "pk", "endpoint", "circuit_open_until"
+        )
+    )
+
+
+def encode(data):
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def post(endpoint, body):
+    """
+    POST a JSON body to one endpoint. Returns the response, or the
+    exception if the request failed.
+    """
+    try:
+        return get_session(endpoint).post(
+            endpoint,
+            data=body.encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeout=settings.WEBHOOK_TIMEOUT,
+        )
+    except requests.RequestException as e:
+        return e
+
+
+def get_error(response):
+    """Describe a failed delivery, or return None if it succeeded."""
+    if isinstance(response, Exception):
+        return "{}: {}".format(type(response).__name__, response)
+    if not response.ok:
+        return "HTTP {}".format(response.status_code)
+    return None
+
+
+def get_backoff(attempts):
+    """Exponential backoff with jitter, so retries don't bunch up."""
+    backoff = min(
+        settings.WEBHOOK_RETRY_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF
+    )
+    return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+def claim(ref):
+    """
+    Mark a delivery as the latest about its subject, such as one
+    message or channel, so retries of earlier ones are dropped.
+
+    A ref says how to rebuild a delivery's payload, as a "source" the
+    webhook tasks know and its "args", so retries needn't carry it.
+    """
+    if ref is None or ref.get("subject") is None:
+        return ref
+    ref = dict(ref, token=uuid.uuid4().hex)
+    # Kept for as long as the delivery could be retried
+    get_cache().set(
+        make_key("delivery", ref["subject"]),
+        ref["token"],
+        (settings.WEBHOOK_RETRIES + 1) * MAX_BACKOFF,
+    )
+    return ref
+
+
+def superseded(ref):
+    """Whether a newer delivery about a ref's subject has been made."""
+    if ref is None or ref.get("subject") is None:
+        return False
+    latest = get_cache().get(make_key("delivery", ref["subject"]))
+    return latest is not None and latest != ref["token"]
+
+
+def record_success(webhook):
+    from slackchat.models import Webhook
+
+    # Updates skip the post_save signal, which would reverify the hook
+    Webhook.objects.filter(pk=webhook.pk).update(
+        failures=0, circuit_open_until=None, last_success=timezone.now()
+    )
+
+
+def record_failure(webhook):
+    """
+    Count a failure against an endpoint, opening its circuit once it
+    has failed too many times in a row.
+    """
+    from slackchat.models import Webhook
+
+    now = timezone.now()
+    Webhook.objects.filter(pk=webhook.pk).update(
+        failures=F("failures") + 1, last_failure=now
+    )
+    opened = Webhook.objects.filter(
+        pk=webhook.pk, failures__gte=settings.WEBHOOK_BREAKER_THRESHOLD
+    ).update(
+        circuit_open_until=now
+        + timedelta(seconds=settings.WEBHOOK_BREAKER_COOLDOWN)
+    )
+    if opened:
+        webhook.circuit_open_until = now + timedelta(
+            seconds=settings.WEBHOOK_BREAKER_COOLDOWN
+        )
+        log_event("WEBHOOK_CIRCUIT_OPEN", webhook.endpoint)
+
+
+def dead_letter(webhook, body, error, attempts):
+    from slackchat.models import DeadLetter
+
+    DeadLetter.objects.create(
+        webhook_id=webhook.pk,
+        payload=json.loads(body),
+        error=error,
+        attempts=attempts,
+    )
+    log_event("WEBHOOK_DEAD_LETTER", "{} {}".format(webhook.endpoint, error))
+
+
+def settle(webhook, body, response, attempts, ref=None):
+    """
+    Record how a delivery went. A failed delivery is retried later
+    with backoff, or dead-lettered once out of retries or while the
+    endpoint's circuit is open. Retries of a delivery with a ref
+    rebuild the payload when they run rather than carrying it.
+
+    Returns whether the delivery succeeded.
+    """
+    from slackchat.tasks.webhook import retry_webhook
+
+    error = get_error(response)
+    if error is None:
+        record_success(webhook)
+        return True
+
+    log_event("WEBHOOK_FAILED", "{} {}".format(webhook.endpoint, error))
+    record_failure(webhook)
+    if attempts > settings.WEBHOOK_RETRIES or webhook.circuit_open():
+        dead_letter(webhook, body, error, attempts)
+    else:
+        retry_webhook.apply_async(
+            (webhook.pk, None if ref else body, attempts, ref),
+            countdown=get_backoff(attempts),
+        )
+    return False
+
+
+def attempt(webhook, body, attempts=0, ref=None):
+    """Try delivering a body to one webhook, unless its circuit is open."""
+    if webhook.circuit_open():
+        dead_letter(webhook, body, "Circuit open", attempts)
+        return False
+    return settle(
+        webhook, body, post(webhook.endpoint, body), attempts + 1, ref
+    )
+
+
+def deliver(data, webhooks=None, ref=None):
+    """
+    Send the same payload to every verified webhook at once.
+
+    The payload is encoded once. Endpoints are posted to in parallel,
+    each with its own timeout, so one slow or failing receiver doesn't
+    hold up the rest. Endpoints that fail are retried in their own
+    tasks, which rebuild the payload from the ref if one is given.
+    Returns a dict of whether each endpoint succeeded.
+    """
+    if webhooks is None:
+        webhooks = get_webhooks()
+    if not webhooks:
+        return {}
+
+    body = encode(data)
+    ref = claim(ref)
+
+    if len(webhooks) == 1:
+        return {webhooks[0].endpoint: attempt(webhooks[0], body, ref=ref)}
+
+    results = {}
+    ready = []
+    for webhook in webhooks:
+        if webhook.circuit_open():
+            dead_letter(webhook, body, "Circuit open", 0)
+            results[webhook.endpoint] = False
+        else:
+            ready.append(webhook)
+
+    # Only the requests run in the pool. Outcomes are recorded here, so
+    # the pool's threads don't open database connections of their own.
+    workers = min(settings.WEBHOOK_WORKERS, len(ready)) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        responses = list(
+            executor.map(lambda w: post(w.endpoint, body), ready)
+        )
+    for webhook, response in zip(ready, responses):
+        results[webhook.endpoint] = settle(webhook, body, response, 1, ref)
+    return results
+
+
+def replay(webhook):
+    """
+    Redeliver a webhook's dead letters, oldest first, stopping at the
+    first one that fails again. Returns how many were delivered.
+    """
+    delivered = 0
+    for letter in webhook.dead_letters.order_by("created"):
+        response = post(webhook.endpoint, encode(letter.payload))
+        error = get_error(response)
+        if error is not None:
+            record_failure(webhook)
+            letter.error = error
+            letter.attempts += 1
+            letter.save(update_fields=["error", "attempts"])
+            break
+        record_success(webhook)
+        letter.delete()
+        delivered += 1
+    return delivered
@@ -1,4 +1,5 @@
 # flake8: noqa
+from .events import handle as handle_event
 from .messages import handle as handle_message
 from .messages import handle_removed as handle_message_removed
 from .reactions import handle_added as handle_reaction_added
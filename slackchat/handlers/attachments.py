@@ -3,11 +3,12 @@ from slackchat.utils import log_event
 from slackchat.models import Attachment, Message
 
 
-def handle(message_pk, attachment):
+def get_data(attachment):
+    """Return the Attachment fields for a Slack attachment, if it has any."""
     # TODO: For now, we're not attaching unfurled tweets.
     # This gets handled by markslack.
     if attachment.get("service_name") == "twitter":
-        return
+        return None
     data = {
         "title": attachment.get("title"),
         "title_link": attachment.get("title_link"),
@@ -26,6 +27,13 @@ def handle(message_pk, attachment):
         "thumb_height": attachment.get("thumb_height"),
     }
     if data.get("title_link") or data.get("image_url"):
+        return data
+    return None
+
+
+def handle(message_pk, attachment):
+    data = get_data(attachment)
+    if data:
         message = Message.objects.get(pk=message_pk)
         a, created = Attachment.objects.get_or_create(message=message, **data)
         if created:
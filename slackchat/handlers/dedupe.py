@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.models import ProcessedEvent
+
+
+def claim(event_id):
+    """
+    Claim an event for processing.
+
+    Returns False if the event has already been claimed. The shared
+    cache answers retries without touching the database; the
+    ProcessedEvent table catches anything the cache has evicted.
+    """
+    if not event_id:
+        return True
+
+    cache = get_cache()
+    if not cache.add(
+        make_key("event", event_id), True, settings.EVENT_DEDUPE_TTL
+    ):
+        return False
+
+    event, created = ProcessedEvent.objects.get_or_create(event_id=event_id)
+
+    if cache.add(make_key("event-prune"), True, settings.EVENT_DEDUPE_TTL):
+        from slackchat.celery import prune_processed_events
+
+        prune_processed_events.delay()
+
+    return created
+
+
+def release(event_id):
+    """Forget a claim so a retried delivery is processed again."""
+    if not event_id:
+        return
+
+    get_cache().delete(make_key("event", event_id))
+    ProcessedEvent.objects.filter(event_id=event_id).delete()
+
+
+def prune():
+    """Delete claims older than the dedupe window."""
+    expired = timezone.now() - timedelta(seconds=settings.EVENT_DEDUPE_TTL)
+    deleted, _ = ProcessedEvent.objects.filter(created__lt=expired).delete()
+    return deleted
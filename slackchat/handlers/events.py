@@ -0,0 +1,44 @@
+from django.db import transaction
+from slackchat.utils import log_event
+
+from .dedupe import claim, release
+from .messages import handle as handle_message
+from .messages import handle_removed as handle_message_removed
+from .reactions import handle_added as handle_reaction_added
+from .reactions import handle_removed as handle_reaction_removed
+
+
+def handle(id, event):
+    """Handle a Slack event once, skipping retried deliveries."""
+    if not claim(id):
+        log_event(200, "EVENT_DUPLICATE")
+        return
+
+    try:
+        # Related objects saved by one event reserialize their message once
+        with transaction.atomic():
+            route(id, event)
+    except Exception:
+        # Let Slack's retry have another go at it
+        release(id)
+        raise
+
+
+def route(id, event):
+    """Route a Slack event to the handler for its type."""
+    if event.get("type") == "message":
+        if event.get("subtype", None) == "message_deleted":
+            handle_message_removed(id, event)
+        elif (
+            event.get("subtype", None) == "message_changed"
+            and event.get("message", {}).get("subtype", None) == "tombstone"
+        ):
+            handle_message_removed(id, event)
+        else:
+            handle_message(id, event)
+
+    if event.get("type") == "reaction_added":
+        handle_reaction_added(id, event)
+
+    if event.get("type") == "reaction_removed":
+        handle_reaction_removed(id, event)
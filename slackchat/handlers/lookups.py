@@ -0,0 +1,66 @@
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.models import Channel, User
+
+# Cached for Slack channels we don't track
+UNTRACKED = "untracked"
+
+
+def get_channel_pk(api_id):
+    """Return the pk of the Channel with a Slack ID, or None."""
+    if not api_id:
+        return None
+
+    cache = get_cache()
+    key = make_key("channel", api_id)
+    pk = cache.get(key)
+    if pk is None:
+        pk = (
+            Channel.objects.filter(api_id=api_id)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        cache.set(key, pk or UNTRACKED, settings.LOOKUP_CACHE_TTL)
+
+    if pk == UNTRACKED:
+        return None
+    return pk
+
+
+def get_user_pk(api_id, create=True):
+    """
+    Return the pk of the User with a Slack ID.
+
+    Creates the user if it doesn't exist, unless create is False,
+    in which case None is returned.
+    """
+    cache = get_cache()
+    key = make_key("user", api_id)
+    pk = cache.get(key)
+    if pk is None:
+        if create:
+            user, created = User.objects.get_or_create(api_id=api_id)
+            if created:
+                # Don't cache a row that could still be rolled back
+                return user.pk
+            pk = user.pk
+        else:
+            pk = (
+                User.objects.filter(api_id=api_id)
+                .values_list("pk", flat=True)
+                .first()
+            )
+            if pk is None:
+                return None
+        cache.set(key, pk, settings.LOOKUP_CACHE_TTL)
+    return pk
+
+
+def forget_channel(api_id):
+    if api_id:
+        get_cache().delete(make_key("channel", api_id))
+
+
+def forget_user(api_id):
+    if api_id:
+        get_cache().delete(make_key("user", api_id))
@@ -0,0 +1,32 @@
+from markslack import MarkSlack
+from slackchat.cache import get_version
+from slackchat.conf import settings
+from slackchat.models import User
+
+_marker = None
+_marker_version = None
+
+
+def get_marker():
+    """
+    Return a MarkSlack instance with templates for every user.
+
+    The instance is kept for the life of the process and rebuilt only
+    when a User has been saved or deleted by any worker since.
+    """
+    global _marker, _marker_version
+
+    version = get_version("users")
+    if _marker is None or version != _marker_version:
+        user_templates = {
+            user.api_id: settings.MARKSLACK_USER_TEMPLATE(user)
+            for user in User.objects.iterator()
+        }
+        _marker = MarkSlack(
+            user_templates=user_templates,
+            link_templates=settings.MARKSLACK_LINK_TEMPLATES,
+            image_template=settings.MARKSLACK_IMAGE_TEMPLATE,
+        )
+        _marker_version = version
+
+    return _marker
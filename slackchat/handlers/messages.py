@@ -2,15 +2,16 @@ from datetime import datetime
 from django.utils.timezone import is_aware, make_aware
 
 from django.core.exceptions import ObjectDoesNotExist
-from markslack import MarkSlack
 
-from slackchat.conf import settings
 from slackchat.utils import log_event
 from slackchat.exceptions import MessageNotFoundError, UserNotFoundError
-from slackchat.models import Channel, KeywordArgument, Message, User
+from slackchat.models import ChatType, KeywordArgument, Message
 
 
 from .attachments import handle as handle_attachment
+from .lookups import get_channel_pk, get_user_pk
+from .marker import get_marker
+from .pending import park
 
 ignored_subtypes = ["group_join", "file_share", "group_archive"]
 
@@ -22,10 +23,13 @@ def strptimestamp(timestamp):
     return date
 
 
+def kwargs_in_threads(channel_pk):
+    return ChatType.objects.get(channel=channel_pk).kwargs_in_threads
+
+
 def handle_removed(id, event):
-    try:
-        channel = Channel.objects.get(api_id=event.get("channel"))
-    except ObjectDoesNotExist:
+    channel_pk = get_channel_pk(event.get("channel"))
+    if channel_pk is None:
         log_event(200, "MESSAGE_IGNORED")
         return
     msg = {
@@ -33,13 +37,13 @@ def handle_removed(id, event):
         "ts": event.get("previous_message").get("ts"),
         "text": event.get("message", {}).get("text", None),
     }
-    user, created = User.objects.get_or_create(api_id=msg.get("user"))
+    user_pk = get_user_pk(msg.get("user"))
 
     # If thread
     if not event.get("message", {}).get(
         "subtype"
     ) == "tombstone" and event.get("previous_message", {}).get("thread_ts"):
-        if not channel.chat_type.kwargs_in_threads:
+        if not kwargs_in_threads(channel_pk):
             return
 
         thread = event.get("previous_message")
@@ -53,16 +57,15 @@ def handle_removed(id, event):
                 "{}".format(strptimestamp(thread.get("thread_ts")))
             )
 
-        try:
-            user = User.objects.get(api_id=thread.get("user"))
-        except ObjectDoesNotExist:
+        thread_user_pk = get_user_pk(thread.get("user"), create=False)
+        if thread_user_pk is None:
             raise UserNotFoundError(thread.get("user"))
 
         try:
             kwarg = KeywordArgument.objects.get(
                 timestamp=strptimestamp(thread.get("ts")),
                 message=original_message,
-                user=user,
+                user_id=thread_user_pk,
             )
         except ObjectDoesNotExist:
             return
@@ -72,27 +75,17 @@ def handle_removed(id, event):
 
     else:
         m = Message.objects.get(
-            channel=channel, timestamp=strptimestamp(msg.get("ts")), user=user
+            channel_id=channel_pk,
+            timestamp=strptimestamp(msg.get("ts")),
+            user_id=user_pk,
         )
         log_event(200, "MESSAGE_DELETED")
         m.delete()
 
 
 def handle(id, event):
-    user_templates = {
-        user.api_id: settings.MARKSLACK_USER_TEMPLATE(user)
-        for user in User.objects.all()
-    }
-
-    marker = MarkSlack(
-        user_templates=user_templates,
-        link_templates=settings.MARKSLACK_LINK_TEMPLATES,
-        image_template=settings.MARKSLACK_IMAGE_TEMPLATE,
-    )
-
-    try:
-        channel = Channel.objects.get(api_id=event.get("channel"))
-    except ObjectDoesNotExist:
+    channel_pk = get_channel_pk(event.get("channel"))
+    if channel_pk is None:
         log_event(200, "MESSAGE_IGNORED")
         return
 
@@ -113,7 +106,7 @@ def handle(id, event):
             "text": event.get("text"),
         }
 
-    user, created = User.objects.get_or_create(api_id=msg.get("user"))
+    user_pk = get_user_pk(msg.get("user"))
 
     thread_ts = event.get("thread_ts", None) or event.get("message", {}).get(
         "thread_ts", None
@@ -123,7 +116,7 @@ def handle(id, event):
         event.get("parent_user_id", None)
         or event.get("message", {}).get("parent_user_id", None)
     ):
-        if not channel.chat_type.kwargs_in_threads:
+        if not kwargs_in_threads(channel_pk):
             return
 
         try:
@@ -137,20 +130,22 @@ def handle(id, event):
                 timestamp=strptimestamp(thread_ts)
             )
         except ObjectDoesNotExist:
-            raise MessageNotFoundError("{}".format(strptimestamp(thread_ts)))
+            # Replayed once the parent message is saved
+            park("message", event.get("channel"), thread_ts, id, event)
+            return
         log_event(200, "KWARG_ADDED")
         KeywordArgument.objects.update_or_create(
             timestamp=strptimestamp(msg.get("ts")),
             message=original_message,
-            user=user,
+            user_id=user_pk,
             defaults={"key": key, "value": value},
         )
     else:
         message, created = Message.objects.update_or_create(
-            channel=channel,
+            channel_id=channel_pk,
             timestamp=strptimestamp(msg.get("ts")),
-            user=user,
-            defaults={"text": marker.mark(msg.get("text"))},
+            user_id=user_pk,
+            defaults={"text": get_marker().mark(msg.get("text"))},
         )
 
         if created:
@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.db import transaction
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.utils import log_event
+
+# How long a worker may hold a parent message's parked events
+LOCK_TIMEOUT = 10
+
+_local = threading.local()
+
+
+def pending_key(channel, ts):
+    # Slack timestamps are seconds with microsecond precision
+    return make_key("pending", channel, "{:.6f}".format(float(ts)))
+
+
+def count(name, n=1):
+    cache = get_cache()
+    key = make_key("pending-count", name)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key, n)
+    except ValueError:
+        pass
+
+
+def stats():
+    """Return how many events have been parked and replayed."""
+    cache = get_cache()
+    return {
+        name: cache.get(make_key("pending-count", name), 0)
+        for name in ("parked", "replayed", "dropped")
+    }
+
+
+@contextmanager
+def locked(key):
+    """Hold the lock on a parent message's parked events."""
+    cache = get_cache()
+    lock = "{}:lock".format(key)
+    token = uuid.uuid4().hex
+    for _ in range(LOCK_TIMEOUT * 20):
+        if cache.add(lock, token, LOCK_TIMEOUT):
+            break
+        time.sleep(0.05)
+    else:
+        # Whoever held it has taken far longer than they may
+        cache.set(lock, token, LOCK_TIMEOUT)
+    try:
+        yield
+    finally:
+        # Only release the lock if it's still ours
+        if cache.get(lock) == token:
+            cache.delete(lock)
+
+
+def parent_exists(channel, ts):
+    from slackchat.models import Message
+
+    from .messages import strptimestamp
+
+    return Message.objects.filter(
+        channel__api_id=channel, timestamp=strptimestamp(ts)
+    ).exists()
+
+
+def park(kind, channel, ts, id, event):
+    """
+    Hold an event that arrived before the message it refers to.
+
+    Events are kept per parent message for PENDING_EVENTS_TTL seconds,
+    up to PENDING_EVENTS_MAX per message.
+    """
+    cache = get_cache()
+    key = pending_key(channel, ts)
+
+    with locked(key):
+        pending = cache.get(key, [])
+        if len(pending) >= settings.PENDING_EVENTS_MAX:
+            count("dropped")
+            log_event(200, "EVENT_DROPPED")
+            return
+        pending.append((kind, id, event))
+        cache.set(key, pending, settings.PENDING_EVENTS_TTL)
+
+    count("parked")
+    log_event(200, "EVENT_PARKED")
+
+    # The parent may have been saved, and its parked events replayed,
+    # since the handler looked for it. An event parked again while its
+    # parent's events replay is one that can't be handled yet.
+    replaying = getattr(_local, "replaying", set())
+    if key not in replaying and parent_exists(channel, ts):
+        replay(channel, ts)
+
+
+def take(key):
+    cache = get_cache()
+    with locked(key):
+        pending = cache.get(key)
+        cache.delete(key)
+    return pending
+
+
+def put_back(key, events):
+    """Return events to the front of a parent message's parked events."""
+    cache = get_cache()
+    with locked(key):
+        pending = events + cache.get(key, [])
+        cache.set(key, pending, settings.PENDING_EVENTS_TTL)
+
+
+def replay(channel, ts):
+    """Handle every event parked for a message that now exists."""
+    from .messages import handle as handle_message
+    from .reactions import handle_added as handle_reaction_added
+
+    handlers = {"message": handle_message, "reaction": handle_reaction_added}
+
+    key = pending_key(channel, ts)
+    pending = take(key)
+    if not pending:
+        return
+
+    _local.replaying = getattr(_local, "replaying", set()) | {key}
+    try:
+        with transaction.atomic():
+            for kind, id, event in pending:
+                handlers[kind](id, event)
+    except Exception:
+        # Nothing was saved, so keep every event for the next replay
+        put_back(key, pending)
+        raise
+    finally:
+        _local.replaying = _local.replaying - {key}
+
+    count("replayed", len(pending))
+    log_event(200, "EVENTS_REPLAYED")
@@ -3,10 +3,13 @@ from datetime import datetime
 from django.core.exceptions import ObjectDoesNotExist
 from markslack import MarkSlack
 from slackchat.exceptions import MessageNotFoundError, ReactionNotFoundError
-from slackchat.models import Argument, Channel, Message, Reaction, User
+from slackchat.models import Argument, Message, Reaction
 
 from slackchat.utils import log_event
 
+from .lookups import get_channel_pk, get_user_pk
+from .pending import park
+
 marker = MarkSlack()
 
 
@@ -20,34 +23,33 @@ def handle_removed(id, event):
     if item.get("type", None) != "message":
         return
 
-    item_user, created = User.objects.get_or_create(
-        api_id=event.get("item_user")
-    )
+    item_user_pk = get_user_pk(event.get("item_user"))
 
-    user, created = User.objects.get_or_create(api_id=event.get("user"))
+    user_pk = get_user_pk(event.get("user"))
 
-    try:
-        channel = Channel.objects.get(api_id=item.get("channel"))
-    except ObjectDoesNotExist:
+    channel_pk = get_channel_pk(item.get("channel"))
+    if channel_pk is None:
         log_event(200, "REACTION_IGNORED")
         return
 
     try:
         message = Message.objects.get(
             timestamp=strptimestamp(item.get("ts")),
-            channel=channel,
-            user=item_user,
+            channel_id=channel_pk,
+            user_id=item_user_pk,
         )
     except ObjectDoesNotExist:
         raise MessageNotFoundError(
             "{} @ {} by {}".format(
-                channel, strptimestamp(item.get("ts")), item_user
+                item.get("channel"),
+                strptimestamp(item.get("ts")),
+                event.get("item_user"),
             )
         )
 
     try:
         reaction = Reaction.objects.get(
-            message=message, user=user, reaction=event.get("reaction")
+            message=message, user_id=user_pk, reaction=event.get("reaction")
         )
     except ObjectDoesNotExist:
         raise ReactionNotFoundError("Can't find reaction.")
@@ -62,43 +64,36 @@ def handle_added(id, event):
     if item.get("type", None) != "message":
         return False
 
-    item_user, created = User.objects.get_or_create(
-        api_id=event.get("item_user")
-    )
+    item_user_pk = get_user_pk(event.get("item_user"))
 
-    try:
-        channel = Channel.objects.get(api_id=item.get("channel"))
-    except ObjectDoesNotExist:
+    channel_pk = get_channel_pk(item.get("channel"))
+    if channel_pk is None:
         log_event(200, "REACTION_IGNORED")
         return
 
     try:
         message = Message.objects.get(
             timestamp=strptimestamp(item.get("ts")),
-            channel=channel,
-            user=item_user,
+            channel_id=channel_pk,
+            user_id=item_user_pk,
         )
     except ObjectDoesNotExist:
-        raise MessageNotFoundError(
-            "{} @ {} by {}".format(
-                channel, strptimestamp(item.get("ts")), item_user
-            )
-        )
+        # Replayed once the message is saved
+        park("reaction", item.get("channel"), item.get("ts"), id, event)
+        return
 
-    reaction_user, created = User.objects.get_or_create(
-        api_id=event.get("user")
-    )
+    reaction_user_pk = get_user_pk(event.get("user"))
 
     reaction_kwargs = {
         "timestamp": strptimestamp(event.get("event_ts")),
         "message": message,
         "reaction": event.get("reaction"),
-        "user": reaction_user,
+        "user_id": reaction_user_pk,
     }
 
     try:
         argument = Argument.objects.get(
-            character=event.get("reaction"), chat_type=channel.chat_type
+            character=event.get("reaction"), chat_type__channel=channel_pk
         )
         reaction_kwargs["argument"] = argument
     except ObjectDoesNotExist:
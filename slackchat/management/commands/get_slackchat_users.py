@@ -1,52 +1,120 @@
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
-
-from django.core.files.base import ContentFile
 from django.core.management.base import BaseCommand
-from slackchat.conf import settings
+from slackchat.avatars import avatar_changed, save_avatar
+from slackchat.cache import bump_version
 from slackchat.models import User
-from slacker import Slacker
+from slackchat.roster import get_names, get_roster
+from slackchat.snapshots import invalidate_user_channels
 from tqdm import tqdm
 
+FIELDS = ('first_name', 'last_name', 'email', 'title')
+
 
 class Command(BaseCommand):
     help = 'Retrieves users from Slack'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Avatars to download at once',
+        )
+
     def handle(self, *args, **options):
-        SLACK = Slacker(settings.SLACK_API_TOKEN)
-        slack_users = SLACK.users.list().body['members']
-        for slack_user in tqdm(slack_users, desc='Users'):
-            id = slack_user['id']
-            profile = slack_user['profile']
-
-            real_name = profile.get('real_name', None)
-            display_name = profile.get('display_name', None)
-            try:
-                first_name, last_name = real_name.split(' ', 1)
-            except ValueError:
-                try:
-                    first_name, last_name = display_name.split(' ', 1)
-                except ValueError:
-                    first_name = real_name or display_name or ''
-                    last_name = ''
-
-            user, created = User.objects.update_or_create(
-                api_id=id,
-                defaults={
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'email': profile.get('email', None),
-                    'title': profile.get('title', 'Staff writer'),
-                }
+        start = time.time()
+        roster = get_roster(refresh=True)
+
+        existing = {
+            user.api_id: user
+            for user in User.objects.filter(api_id__in=list(roster))
+        }
+
+        created = []
+        changed = []
+        for id, profile in roster.items():
+            first_name, last_name = get_names(profile)
+            values = {
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': profile.get('email', None),
+                'title': profile.get('title', 'Staff writer'),
+            }
+
+            user = existing.get(id)
+            if user is None:
+                created.append(User(api_id=id, **values))
+            elif any(getattr(user, f) != v for f, v in values.items()):
+                for field, value in values.items():
+                    setattr(user, field, value)
+                changed.append(user)
+
+        # Bulk writes skip the post_save signal, so new users aren't
+        # each sent to update_users. Their avatars are fetched below.
+        User.objects.bulk_create(created, batch_size=500)
+        User.objects.bulk_update(changed, FIELDS, batch_size=500)
+
+        avatars = [
+            user
+            for user in created + list(existing.values())
+            if avatar_changed(user, roster[user.api_id])
+        ]
+        saved = self.save_avatars(avatars, roster, options['workers'])
+
+        touched = [user.pk for user in changed + saved]
+        if touched:
+            invalidate_user_channels(touched)
+        elif created:
+            # In no channel yet, but cached mention markers need them
+            bump_version('users')
+
+        elapsed = time.time() - start
+        self.stdout.write(
+            'Synced {} users in {:.1f}s ({:.0f} users/s): {} created, '
+            '{} updated, {} unchanged. Saved {} of {} changed '
+            'avatars.'.format(
+                len(roster),
+                elapsed,
+                len(roster) / elapsed if elapsed else 0,
+                len(created),
+                len(changed),
+                len(roster) - len(created) - len(changed),
+                len(saved),
+                len(avatars),
             )
+        )
+
+    def save_avatars(self, users, roster, workers):
+        """
+        Download and resize avatars in parallel, then record them at
+        once. Returns the users whose images changed.
+        """
+        saved = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    save_avatar, user, roster[user.api_id], False
+                ): user
+                for user in users
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc='Avatars'
+            ):
+                user = futures[future]
+                try:
+                    changed = future.result()
+                except Exception as e:
+                    self.stderr.write(
+                        'Avatar for {} failed: {}'.format(user.api_id, e)
+                    )
+                    continue
+                saved.append((user, changed))
 
-            if created and profile.get('image_192', False):
-                r = requests.get(profile.get('image_192'), stream=True)
-                img = r.raw.read()
-                user.image.save(
-                    'profile-{}.jpg'.format(uuid.uuid4().hex[:10]),
-                    ContentFile(img),
-                    save=True
-                )
-            user.save()
+        User.objects.bulk_update(
+            [user for user, _ in saved],
+            ('image', 'avatar_hash', 'image_hash', 'image_variants'),
+            batch_size=500,
+        )
+        return [user for user, changed in saved if changed]
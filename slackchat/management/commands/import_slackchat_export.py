@@ -0,0 +1,265 @@
+import json
+import zipfile
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from slackchat.celery import update_users
+from slackchat.handlers.attachments import get_data as get_attachment_data
+from slackchat.handlers.marker import get_marker
+from slackchat.handlers.messages import strptimestamp
+from slackchat.models import (
+    Argument,
+    Attachment,
+    Channel,
+    ChannelChange,
+    KeywordArgument,
+    Message,
+    Reaction,
+    User,
+)
+from slackchat.notifications import request_republish
+from slackchat.serializers.fast import message_data
+from slackchat.snapshots import invalidate_channel
+from tqdm import tqdm
+
+
+class Command(BaseCommand):
+    help = "Imports a channel's history from a Slack export archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("archive", help="Path to the Slack export ZIP")
+        parser.add_argument(
+            "export_channel", help="Name of the channel in the export"
+        )
+        parser.add_argument("channel", help="ID of the slackchat Channel")
+
+    def handle(self, *args, **options):
+        try:
+            channel = Channel.objects.select_related("chat_type").get(
+                pk=options["channel"]
+            )
+        except (Channel.DoesNotExist, ValueError):
+            raise CommandError("Channel not found.")
+
+        self.channel = channel
+        self.arguments = {
+            argument.character: argument
+            for argument in Argument.objects.filter(
+                chat_type=channel.chat_type
+            )
+        }
+        self.users = {}
+        self.new_users = []
+        self.message_pks = []
+        self.threads = []
+
+        prefix = "{}/".format(options["export_channel"].strip("/"))
+
+        with zipfile.ZipFile(options["archive"]) as archive:
+            days = sorted(
+                name
+                for name in archive.namelist()
+                if name.startswith(prefix) and name.endswith(".json")
+            )
+            if not days:
+                raise CommandError(
+                    "No messages for {} in the archive.".format(prefix)
+                )
+
+            for day in tqdm(days, desc="Days"):
+                with archive.open(day) as f:
+                    messages = json.loads(f.read().decode("utf-8"))
+                with transaction.atomic():
+                    self.import_day(messages)
+
+        with transaction.atomic():
+            self.import_threads()
+
+        self.serialize_messages()
+        invalidate_channel(channel.pk)
+
+        if self.new_users:
+            update_users.delay(self.new_users)
+
+        if channel.published:
+            request_republish(channel)
+
+        self.stdout.write(
+            "Imported {} messages.".format(len(self.message_pks))
+        )
+
+    def resolve_users(self, api_ids):
+        """Map Slack IDs to User pks, creating any missing users at once."""
+        missing = set(api_ids) - set(self.users)
+        if not missing:
+            return
+
+        for pk, api_id in User.objects.filter(api_id__in=missing).values_list(
+            "pk", "api_id"
+        ):
+            self.users[api_id] = pk
+            missing.discard(api_id)
+
+        created = User.objects.bulk_create(
+            [User(api_id=api_id) for api_id in missing]
+        )
+        for user in created:
+            self.users[user.api_id] = user.pk
+            self.new_users.append(user.pk)
+
+    def import_day(self, day):
+        marker = get_marker()
+        kwargs_in_threads = self.channel.chat_type.kwargs_in_threads
+
+        # Only plain messages are imported; joins, edits, file shares
+        # and bot posts all carry a subtype.
+        slack_messages = [
+            m
+            for m in day
+            if m.get("type") == "message"
+            and not m.get("subtype")
+            and m.get("user")
+        ]
+
+        api_ids = set()
+        for slack_message in slack_messages:
+            api_ids.add(slack_message["user"])
+            for reaction in slack_message.get("reactions", []):
+                api_ids.update(reaction.get("users", []))
+        self.resolve_users(api_ids)
+
+        timestamps = [strptimestamp(m["ts"]) for m in slack_messages]
+        existing = set(
+            Message.objects.filter(timestamp__in=timestamps).values_list(
+                "timestamp", flat=True
+            )
+        )
+
+        messages = []
+        for slack_message, timestamp in zip(slack_messages, timestamps):
+            thread_ts = slack_message.get("thread_ts")
+            if (
+                thread_ts
+                and thread_ts != slack_message["ts"]
+                and slack_message.get("parent_user_id")
+            ):
+                if kwargs_in_threads:
+                    self.threads.append(slack_message)
+                continue
+
+            if timestamp in existing:
+                continue
+
+            message = Message(
+                channel=self.channel,
+                timestamp=timestamp,
+                user_id=self.users[slack_message["user"]],
+                text=marker.mark(slack_message.get("text", "")),
+            )
+            messages.append((message, slack_message))
+
+        Message.objects.bulk_create([message for message, _ in messages])
+        ChannelChange.objects.bulk_create(
+            [
+                ChannelChange(channel=self.channel, timestamp=m.timestamp)
+                for m, _ in messages
+            ]
+        )
+
+        reactions = []
+        attachments = []
+        for message, slack_message in messages:
+            self.message_pks.append(message.pk)
+
+            offset = 0
+            for reaction in slack_message.get("reactions", []):
+                for api_id in reaction.get("users", []):
+                    # Exports don't date reactions, so they are stamped
+                    # just after their message to keep timestamps unique.
+                    offset += 1
+                    reactions.append(
+                        Reaction(
+                            timestamp=message.timestamp
+                            + timedelta(microseconds=offset),
+                            message_id=message.pk,
+                            reaction=reaction["name"],
+                            argument=self.arguments.get(reaction["name"]),
+                            user_id=self.users[api_id],
+                        )
+                    )
+
+            for attachment in slack_message.get("attachments", []):
+                data = get_attachment_data(attachment)
+                if data:
+                    attachments.append(
+                        Attachment(message_id=message.pk, **data)
+                    )
+
+        taken = set(
+            Reaction.objects.filter(
+                timestamp__in=[r.timestamp for r in reactions]
+            ).values_list("timestamp", flat=True)
+        )
+        Reaction.objects.bulk_create(
+            [r for r in reactions if r.timestamp not in taken]
+        )
+        Attachment.objects.bulk_create(attachments)
+
+    def import_threads(self):
+        parents = dict(
+            Message.objects.filter(
+                channel=self.channel,
+                timestamp__in=[
+                    strptimestamp(m["thread_ts"]) for m in self.threads
+                ],
+            ).values_list("timestamp", "pk")
+        )
+        timestamps = [strptimestamp(m["ts"]) for m in self.threads]
+        existing = set(
+            KeywordArgument.objects.filter(
+                timestamp__in=timestamps
+            ).values_list("timestamp", flat=True)
+        )
+
+        kwargs = []
+        for slack_message, timestamp in zip(self.threads, timestamps):
+            parent = parents.get(strptimestamp(slack_message["thread_ts"]))
+            if not parent or timestamp in existing:
+                continue
+            try:
+                key, value = slack_message.get("text", "").split(": ", 1)
+            except ValueError:
+                # Don't handle threads that don't follow key-value pattern
+                continue
+            kwargs.append(
+                KeywordArgument(
+                    timestamp=timestamp,
+                    key=key,
+                    value=value,
+                    message_id=parent,
+                    user_id=self.users[slack_message["user"]],
+                )
+            )
+        KeywordArgument.objects.bulk_create(kwargs)
+
+    def serialize_messages(self, chunk_size=500):
+        """Serialize each imported message once, without firing signals."""
+        for i in tqdm(
+            range(0, len(self.message_pks), chunk_size), desc="Serializing"
+        ):
+            pks = self.message_pks[i:i + chunk_size]
+            messages = (
+                Message.objects.filter(pk__in=pks)
+                .select_related("user", "channel__chat_type")
+                .prefetch_related(
+                    "reactions__user",
+                    "reactions__argument",
+                    "attachments",
+                    "kwargs",
+                )
+            )
+            for message in messages:
+                Message.objects.filter(pk=message.pk).update(
+                    serialized=message_data(message)
+                )
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0011_processedevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='api_id',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+    ]
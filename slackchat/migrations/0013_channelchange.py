@@ -0,0 +1,27 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0012_user_api_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('timestamp', models.DateTimeField(help_text='Timestamp of the message')),
+                ('deleted', models.BooleanField(default=False)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('channel', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='slackchat.Channel')),
+            ],
+            options={
+                'index_together': {('channel', 'id')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0013_channelchange'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, help_text='Last time anything in the serialized channel changed.'),
+        ),
+        migrations.AddField(
+            model_name='chattype',
+            name='modified',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
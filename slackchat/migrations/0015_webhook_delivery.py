@@ -0,0 +1,49 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:45
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0014_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='webhook',
+            name='circuit_open_until',
+            field=models.DateTimeField(editable=False, help_text='Deliveries skip this endpoint until then, after failing repeatedly.', null=True),
+        ),
+        migrations.AddField(
+            model_name='webhook',
+            name='failures',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Consecutive failed deliveries.'),
+        ),
+        migrations.AddField(
+            model_name='webhook',
+            name='last_failure',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='webhook',
+            name='last_success',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='DeadLetter',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', django.contrib.postgres.fields.jsonb.JSONField()),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('webhook', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dead_letters', to='slackchat.Webhook')),
+            ],
+            options={
+                'ordering': ('created',),
+            },
+        ),
+    ]
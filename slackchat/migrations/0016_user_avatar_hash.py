@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0015_webhook_delivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_hash',
+            field=models.CharField(blank=True, editable=False, help_text="Slack's hash of the avatar last saved to image.", max_length=40),
+        ),
+    ]
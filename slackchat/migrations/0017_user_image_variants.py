@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:52
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0016_user_avatar_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='image_hash',
+            field=models.CharField(blank=True, editable=False, help_text="Hash of image's contents, which its file is named by.", max_length=40),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='image_variants',
+            field=django.contrib.postgres.fields.jsonb.JSONField(blank=True, editable=False, help_text='Resized copies of image, by format and width.', null=True),
+        ),
+    ]
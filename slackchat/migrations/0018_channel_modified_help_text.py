@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 04:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slackchat', '0017_user_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='channel',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, help_text='Last time the channel, or a user or chat type in it,         changed. Changes to its messages are kept in the cache.'),
+        ),
+    ]
@@ -2,10 +2,13 @@
 from .argument import Argument
 from .attachment import Attachment
 from .channel import Channel
+from .channel_change import ChannelChange
 from .chat_type import ChatType
 from .custom_content_template import CustomContentTemplate
+from .dead_letter import DeadLetter
 from .keyword_argument import KeywordArgument
 from .message import Message
+from .processed_event import ProcessedEvent
 from .reaction import Reaction
 from .user import User
 from .webhook import Webhook
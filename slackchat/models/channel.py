@@ -8,9 +8,9 @@ from django.db import models
 from django.urls import reverse
 from django.utils.encoding import escape_uri_path
 from django.utils.safestring import mark_safe
-from markdown import markdown
 from slackchat.conf import settings
 from slackchat.fields import MarkdownField
+from slackchat.rendering import render_markdown
 
 
 class Channel(models.Model):
@@ -86,6 +86,12 @@ class Channel(models.Model):
         while chat is live.",
     )
 
+    modified = models.DateTimeField(
+        auto_now=True,
+        help_text="Last time the channel, or a user or chat type in it, \
+        changed. Changes to its messages are kept in the cache.",
+    )
+
     @property
     def published_link(self):
         if settings.PUBLISH_ROOT:
@@ -133,7 +139,7 @@ class Channel(models.Model):
 
     def get_introduction(self):
         if self.chat_type.render_to_html:
-            return mark_safe(markdown(self.introduction))
+            return mark_safe(render_markdown(self.introduction))
         return self.introduction
 
     def __str__(self):
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class ChannelChange(models.Model):
+    """
+    A message created, changed or deleted in a channel.
+
+    The auto-incrementing id is the cursor renderers poll for
+    changes from.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    channel = models.ForeignKey(
+        "Channel", related_name="changes", on_delete=models.CASCADE
+    )
+    timestamp = models.DateTimeField(help_text="Timestamp of the message")
+    deleted = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        index_together = ("channel", "id")
+
+    def __str__(self):
+        return "{} @ {}".format(self.channel, self.timestamp)
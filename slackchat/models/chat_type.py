@@ -24,6 +24,7 @@ class ChatType(ForeignFormBaseModel):
         default=True,
         help_text="Whether users can create kwargs in threads."
     )
+    modified = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
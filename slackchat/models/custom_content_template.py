@@ -1,5 +1,11 @@
+import re
+
 from django.db import models
 from django.contrib.postgres.fields import JSONField
+from slackchat.cache import get_version
+
+# Compiled templates per chat type, kept for the life of the process
+_registry = {}
 
 
 class CustomContentTemplate(models.Model):
@@ -43,3 +49,23 @@ class CustomContentTemplate(models.Model):
 
     def __str__(self):
         return self.name
+
+
+def get_compiled_templates(chat_type_id):
+    """
+    Return a chat type's templates paired with their compiled search
+    strings.
+
+    Rebuilt only after a CustomContentTemplate is saved or deleted.
+    """
+    version = get_version("content-templates")
+    entry = _registry.get(chat_type_id)
+    if entry is None or entry[0] != version:
+        templates = [
+            (template, re.compile(template.search_string))
+            for template in CustomContentTemplate.objects.filter(
+                chat_type_id=chat_type_id
+            )
+        ]
+        entry = _registry[chat_type_id] = (version, templates)
+    return entry[1]
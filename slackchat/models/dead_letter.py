@@ -0,0 +1,27 @@
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+
+from .webhook import Webhook
+
+
+class DeadLetter(models.Model):
+    """
+    A webhook delivery that was given up on.
+
+    Kept so it can be replayed from the Webhook admin once the
+    endpoint is back.
+    """
+
+    webhook = models.ForeignKey(
+        Webhook, on_delete=models.CASCADE, related_name="dead_letters"
+    )
+    payload = JSONField()
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("created",)
+
+    def __str__(self):
+        return "{} to {}".format(self.payload.get("type"), self.webhook)
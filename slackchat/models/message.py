@@ -1,11 +1,9 @@
-import re
-
 from django.contrib.postgres.fields import JSONField
 from django.db import models
 from django.utils.safestring import mark_safe
-from markdown import markdown
+from slackchat.rendering import render_markdown
 
-from .custom_content_template import CustomContentTemplate
+from .custom_content_template import get_compiled_templates
 
 
 class Message(models.Model):
@@ -29,16 +27,16 @@ class Message(models.Model):
         return self.text[:50]
 
     def html(self):
-        return mark_safe(markdown(self.get_content()))
+        return mark_safe(render_markdown(self.get_content()))
 
     def get_content(self):
         running_text = self.text
         matches = self.find_template_matches()
 
         if len(matches) > 0:
-            for template, _ in matches:
+            for template, match in matches:
                 if template and template.content_template != "":
-                    search = re.search(template.search_string, running_text)
+                    search = match.re.search(running_text)
                     if search:
                         groups = search.groups()
                         running_text = template.content_template.format(
@@ -87,23 +85,35 @@ class Message(models.Model):
         return output_dict
 
     def find_template_matches(self):
-        matches = []
+        # Serializing asks for matches several times; match only once.
+        # Checked before the templates, whose version lives in the
+        # shared cache.
+        memo = getattr(self, "_template_matches", None)
+        if memo and memo[0] == self.text:
+            return memo[1]
 
-        for template in CustomContentTemplate.objects.filter(
-            chat_type=self.channel.chat_type
+        matches = []
+        for template, pattern in get_compiled_templates(
+            self.channel.chat_type_id
         ):
-            match = re.search(template.search_string, self.text)
+            match = pattern.search(self.text)
             if match:
                 matches.append((template, match))
+
+        self._template_matches = (self.text, matches)
         return matches
 
+    def forget_template_matches(self):
+        """Match templates afresh, as they may have changed since."""
+        self._template_matches = None
+
     def serialize(self):
         self.save()
 
     def save(self, *args, **kwargs):
-        from slackchat.serializers import MessageSerializer
+        from slackchat.serializers.fast import message_data
 
-        self.serialized = MessageSerializer(self).data
+        self.serialized = message_data(self)
         super().save(*args, **kwargs)
 
     def __str__(self):
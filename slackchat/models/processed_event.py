@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class ProcessedEvent(models.Model):
+    """
+    A Slack event that has already been handled.
+
+    Used to skip events Slack delivers more than once.
+    """
+
+    event_id = models.CharField(max_length=50, primary_key=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.event_id
@@ -1,3 +1,4 @@
+from django.contrib.postgres.fields import JSONField
 from django.db import models
 from slackchat.conf import settings
 
@@ -7,12 +8,30 @@ class User(models.Model):
     A Slack user who posts in a slackchat channel.
     """
 
-    api_id = models.CharField(max_length=50)
+    api_id = models.CharField(max_length=50, db_index=True)
 
     first_name = models.CharField(max_length=100, blank=True, null=True)
     last_name = models.CharField(max_length=200, blank=True, null=True)
     email = models.EmailField(blank=True, null=True)
     image = models.ImageField(upload_to=settings.USER_IMAGE_UPLOAD_TO)
+    avatar_hash = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        help_text="Slack's hash of the avatar last saved to image.",
+    )
+    image_hash = models.CharField(
+        max_length=40,
+        blank=True,
+        editable=False,
+        help_text="Hash of image's contents, which its file is named by.",
+    )
+    image_variants = JSONField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Resized copies of image, by format and width.",
+    )
     title = models.CharField(max_length=255)
 
     def __str__(self):
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class Webhook(models.Model):
@@ -12,5 +13,27 @@ class Webhook(models.Model):
     endpoint = models.URLField(unique=True)
     verified = models.BooleanField(default=False)
 
+    failures = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Consecutive failed deliveries."
+    )
+    last_success = models.DateTimeField(null=True, editable=False)
+    last_failure = models.DateTimeField(null=True, editable=False)
+    circuit_open_until = models.DateTimeField(
+        null=True,
+        editable=False,
+        help_text=(
+            "Deliveries skip this endpoint until then, after failing "
+            "repeatedly."
+        ),
+    )
+
+    def circuit_open(self):
+        return bool(
+            self.circuit_open_until
+            and self.circuit_open_until > timezone.now()
+        )
+
+    circuit_open.boolean = True
+
     def __str__(self):
         return self.endpoint
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+
+from django.db import transaction
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+
+# Extra seconds batched updates are kept, in case the flush runs late
+BATCH_TTL_MARGIN = 60 * 5
+
+# Seconds before flushing the rest of an incomplete batch
+GAP_RETRY = 1
+
+
+def notify(channel_id, chat_type, update_type, message, message_pk=None):
+    """
+    Send an update_notification for a message, or add it to the
+    channel's current batch if batching is on.
+
+    Pass the message's pk for the worker to read its serialization if
+    the message's data is None, and for retries to reread it. Without
+    the chat type, pass None for the worker to look it up.
+    """
+    from slackchat.celery import flush_webhook_batch, post_webhook
+
+    window = settings.WEBHOOK_BATCH_WINDOW
+    if not window:
+        post_webhook.delay(
+            channel_id, chat_type, update_type, message, message_pk=message_pk
+        )
+        return
+
+    cache = get_cache()
+    seq_key = make_key("webhook-batch-seq", channel_id)
+    cache.add(seq_key, 0, None)
+    seq = cache.incr(seq_key)
+    cache.set(
+        make_key("webhook-batch", channel_id, seq),
+        (update_type, message, message_pk),
+        window + BATCH_TTL_MARGIN,
+    )
+
+    # The first update in a batch schedules its flush
+    if cache.add(
+        make_key("webhook-batch-open", channel_id),
+        True,
+        window + BATCH_TTL_MARGIN,
+    ):
+        flush_webhook_batch.apply_async(
+            (channel_id, chat_type), countdown=window
+        )
+        return
+
+    flushed = cache.get(make_key("webhook-batch-flushed", channel_id), 0)
+    if (seq - flushed) % settings.WEBHOOK_BATCH_SIZE == 0:
+        flush_webhook_batch.delay(channel_id, chat_type)
+
+
+def queue_channel_request(task, channel):
+    from slackchat.snapshots import get_channel_version
+
+    # Only a reference goes through the broker. The worker fetches the
+    # payload for the channel's version once the change has committed.
+    pk = str(channel.pk)
+    chat_type = channel.chat_type.name
+    transaction.on_commit(
+        lambda: task.delay(pk, chat_type, get_channel_version(pk))
+    )
+
+
+def request_republish(channel):
+    """Ask webhooks to republish a channel."""
+    from slackchat.celery import post_webhook_republish
+
+    queue_channel_request(post_webhook_republish, channel)
+
+
+def request_unpublish(channel):
+    """Ask webhooks to unpublish a channel."""
+    from slackchat.celery import post_webhook_unpublish
+
+    queue_channel_request(post_webhook_unpublish, channel)
+
+
+def get_serialized(pks):
+    """Map message pks to their stored serializations."""
+    from slackchat.models import Message
+
+    if not pks:
+        return {}
+    return dict(
+        Message.objects.filter(pk__in=pks).values_list("pk", "serialized")
+    )
+
+
+def collapse(updates):
+    """
+    Reduce a list of (update_type, message, message_pk) to the latest
+    state of each message, in the order they last changed.
+
+    A message created and deleted within the batch is left out.
+    """
+    serialized = get_serialized(
+        [pk for _, message, pk in updates if not message and pk]
+    )
+
+    first_types = {}
+    latest = OrderedDict()
+    for update_type, message, message_pk in updates:
+        message = message or serialized.get(message_pk)
+        if not message:
+            continue
+        key = message.get("timestamp")
+        first_types.setdefault(key, update_type)
+        latest.pop(key, None)
+        latest[key] = (update_type, message)
+
+    changes = []
+    for key, (update_type, message) in latest.items():
+        if first_types[key] == "message_created":
+            if update_type == "message_deleted":
+                continue
+            update_type = "message_created"
+        changes.append({"update_type": update_type, "message": message})
+    return changes
+
+
+def take_batch(channel_id):
+    """
+    Claim the updates queued for a channel since the last flush.
+
+    Returns a list of updates, and whether the batch is complete. It
+    isn't when an update's number has been taken but the update isn't
+    written yet. Those after it are left for another flush, which
+    gives up on the missing update if it still isn't there.
+
+    Returns None if another worker is flushing the channel already.
+    """
+    cache = get_cache()
+    lock = make_key("webhook-batch-lock", channel_id)
+    if not cache.add(lock, True, BATCH_TTL_MARGIN):
+        return None
+
+    try:
+        # Updates from here on start a new batch
+        cache.delete(make_key("webhook-batch-open", channel_id))
+
+        flushed_key = make_key("webhook-batch-flushed", channel_id)
+        gap_key = make_key("webhook-batch-gap", channel_id)
+        flushed = cache.get(flushed_key, 0)
+        seq = cache.get(make_key("webhook-batch-seq", channel_id), 0)
+        if seq <= flushed:
+            return [], True
+
+        keys = {
+            n: make_key("webhook-batch", channel_id, n)
+            for n in range(flushed + 1, seq + 1)
+        }
+        queued = cache.get_many(list(keys.values()))
+
+        updates = []
+        complete = True
+        for n in range(flushed + 1, seq + 1):
+            if keys[n] in queued:
+                updates.append(queued[keys[n]])
+            elif cache.get(gap_key) != n:
+                # Not written yet. Wait for it, but only once.
+                cache.set(gap_key, n, BATCH_TTL_MARGIN)
+                complete = False
+                break
+            flushed = n
+
+        cache.delete_many([keys[n] for n in keys if n <= flushed])
+        cache.set(flushed_key, flushed, None)
+        return updates, complete
+    finally:
+        cache.delete(lock)
@@ -0,0 +1,63 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from slackchat.authentication import import_class
+from slackchat.conf import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Renders JSON with orjson when it's installed, falling back to the
+    standard library encoder otherwise, or for data orjson can't encode,
+    such as integers wider than 64 bits.
+
+    Output matches JSONRenderer's compact output, except for floats:
+    orjson writes exponents without a "+" or leading zeros (1e16 rather
+    than 1e+16), and NaN and infinity as null, where JSONRenderer raises
+    ValueError. Either way the numbers parse to the same values.
+    """
+
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Let DRF's encoder format datetimes, so they end in "Z" too
+            ret = orjson.dumps(
+                data,
+                default=self.encoder.default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME
+                | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # As JSONRenderer does, for JSON embedded in <script> tags
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def get_json_renderer():
+    """Return the renderer class configured by JSON_RENDERER."""
+    return import_class(settings.JSON_RENDERER)
+
+
+def get_renderer_classes():
+    """The project's default renderers, with ours in place for JSON."""
+    return [get_json_renderer()] + [
+        renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if not issubclass(renderer, JSONRenderer)
+    ]
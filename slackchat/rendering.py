@@ -0,0 +1,57 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from markdown import markdown
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+
+_rendered = OrderedDict()
+_lock = threading.Lock()
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def render_markdown(text):
+    """
+    Render markdown to HTML, reusing earlier renders of the same text.
+
+    Renders are kept in a per-process LRU of MARKDOWN_CACHE_SIZE
+    entries and, if MARKDOWN_SHARED_CACHE is set, in the shared cache
+    for MARKDOWN_CACHE_TTL seconds.
+    """
+    key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    with _lock:
+        if key in _rendered:
+            _rendered.move_to_end(key)
+            _stats["hits"] += 1
+            return _rendered[key]
+
+    html = None
+    if settings.MARKDOWN_SHARED_CACHE:
+        html = get_cache().get(make_key("markdown", key))
+
+    if html is None:
+        html = markdown(text)
+        if settings.MARKDOWN_SHARED_CACHE:
+            get_cache().set(
+                make_key("markdown", key), html, settings.MARKDOWN_CACHE_TTL
+            )
+        counter = "misses"
+    else:
+        counter = "shared_hits"
+
+    with _lock:
+        _stats[counter] += 1
+        if settings.MARKDOWN_CACHE_SIZE:
+            _rendered[key] = html
+            while len(_rendered) > settings.MARKDOWN_CACHE_SIZE:
+                _rendered.popitem(last=False)
+
+    return html
+
+
+def stats():
+    """Return this process's markdown cache hit and miss counts."""
+    with _lock:
+        return dict(_stats, size=len(_rendered))
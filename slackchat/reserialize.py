@@ -0,0 +1,69 @@
+import threading
+
+from django.db import transaction
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+
+_local = threading.local()
+
+
+def mark_dirty(message_pk):
+    """
+    Queue a message to be reserialized when the transaction commits.
+
+    However many related objects change inside one transaction, each
+    message is only reserialized once. The queue belongs to the hook
+    registered with the transaction, so a rollback discards both.
+    """
+    pending = getattr(_local, "pending", None)
+    connection = transaction.get_connection()
+    if pending is not None and any(
+        hook is pending[0] for _, hook in connection.run_on_commit
+    ):
+        pending[1].add(message_pk)
+        return
+
+    pks = {message_pk}
+
+    def hook():
+        flush(pks)
+
+    _local.pending = (hook, pks)
+    transaction.on_commit(hook)
+
+
+def flush(pks):
+    if settings.RESERIALIZE_DEBOUNCE:
+        from slackchat.celery import reserialize_messages
+
+        # Skip messages that already have a reserialization scheduled
+        cache = get_cache()
+        pks = [
+            pk
+            for pk in pks
+            if cache.add(
+                make_key("reserialize", pk),
+                True,
+                settings.RESERIALIZE_DEBOUNCE,
+            )
+        ]
+        if pks:
+            reserialize_messages.apply_async(
+                (pks,), countdown=settings.RESERIALIZE_DEBOUNCE
+            )
+    else:
+        reserialize(pks)
+
+
+def reserialize(pks):
+    from slackchat.models import Message
+
+    messages = (
+        Message.objects.filter(pk__in=pks)
+        .select_related("user", "channel__chat_type")
+        .prefetch_related(
+            "reactions__user", "reactions__argument", "attachments", "kwargs"
+        )
+    )
+    for message in messages:
+        message.serialize()
@@ -0,0 +1,143 @@
+import time
+import uuid
+
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+from slackchat.slack import TIMEOUT, SlackError, get_client
+
+# Members requested per page of users.list
+PAGE_SIZE = 200
+
+# Up to this many users missing from the cache are looked up one by
+# one with users.info, rather than by fetching the whole roster.
+INFO_LOOKUP_MAX = 10
+
+# How long the lock on fetching the roster lasts without being renewed.
+# It's renewed for each page, which may wait out a minute of its rate
+# limit before the request itself.
+LOCK_TIMEOUT = 60 + TIMEOUT
+
+# The parts of a Slack profile slackchat uses. Only these are cached.
+PROFILE_FIELDS = (
+    "real_name",
+    "display_name",
+    "title",
+    "email",
+    "image_192",
+    "avatar_hash",
+)
+
+
+def trim(profile):
+    return {
+        field: profile[field] for field in PROFILE_FIELDS if field in profile
+    }
+
+
+def fetch_roster(on_page=None):
+    """Fetch every workspace member's profile, a page at a time."""
+    roster = {}
+    cursor = None
+    while True:
+        if on_page:
+            on_page()
+        params = {"limit": PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        body = get_client().call("users.list", **params)
+        for member in body["members"]:
+            roster[member["id"]] = trim(member.get("profile", {}))
+        cursor = body.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            return roster
+
+
+def fetch_profile(api_id):
+    body = get_client().call("users.info", user=api_id)
+    return trim(body["user"].get("profile", {}))
+
+
+def get_roster(refresh=False):
+    """
+    Return a dict of every workspace member's profile, keyed by their
+    Slack ID.
+
+    The roster is cached for ROSTER_TTL seconds. Only one worker
+    fetches it at a time. Others wanting it meanwhile wait for that
+    fetch instead of making their own.
+    """
+    cache = get_cache()
+    key = make_key("roster")
+
+    if not refresh:
+        roster = cache.get(key)
+        if roster is not None:
+            return roster
+
+    lock = make_key("roster-lock")
+    token = uuid.uuid4().hex
+    while not cache.add(lock, token, LOCK_TIMEOUT):
+        # Another worker is fetching it. The lock outlives their fetch
+        # only if they've died, in which case take over.
+        while cache.get(lock):
+            time.sleep(0.5)
+        roster = cache.get(key)
+        if roster is not None:
+            return roster
+
+    def renew():
+        if cache.get(lock) == token:
+            cache.set(lock, token, LOCK_TIMEOUT)
+
+    try:
+        roster = fetch_roster(on_page=renew)
+        cache.set(key, roster, settings.ROSTER_TTL)
+        return roster
+    finally:
+        # Only release the lock if it's still ours
+        if cache.get(lock) == token:
+            cache.delete(lock)
+
+
+def get_profiles(api_ids):
+    """
+    Return Slack profiles for the given Slack IDs, keyed by ID. Users
+    Slack doesn't know are left out.
+
+    Profiles come from the cached roster. A few users missing from it
+    are looked up on their own. The roster is fetched again when many
+    are missing.
+    """
+    api_ids = set(api_ids)
+    roster = get_cache().get(make_key("roster")) or {}
+
+    missing = api_ids - set(roster)
+    if len(missing) > INFO_LOOKUP_MAX:
+        roster = get_roster(refresh=True)
+        missing = api_ids - set(roster)
+
+    profiles = {
+        api_id: roster[api_id] for api_id in api_ids if api_id in roster
+    }
+    for api_id in missing:
+        try:
+            profiles[api_id] = fetch_profile(api_id)
+        except SlackError:
+            # Not a member of the workspace
+            continue
+    return profiles
+
+
+def get_names(profile):
+    """Split a profile's name into a first and last name."""
+    real_name = profile.get("real_name", None)
+    display_name = profile.get("display_name", None)
+    try:
+        first_name, last_name = real_name.split(" ", 1)
+    except (AttributeError, ValueError):
+        try:
+            first_name, last_name = display_name.split(" ", 1)
+        except (AttributeError, ValueError):
+            first_name = real_name or display_name or ""
+            last_name = ""
+    return first_name, last_name
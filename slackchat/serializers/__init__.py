@@ -2,6 +2,7 @@
 from .attachment import AttachmentSerializer
 from .channel import (
     ChannelSerializer,
+    ChannelEnvelopeSerializer,
     ChannelListSerializer,
     ChannelCMSSerializer,
 )
@@ -1,8 +1,9 @@
 import os
 
-from django.utils import timezone
+from django.db.models import Q
 from rest_framework import serializers
-from slackchat.models import Channel
+from slackchat.models import Channel, Message, Reaction, User
+from slackchat.snapshots import get_modified
 
 from .message import MessageSerializer
 from .user import UserSerializer
@@ -43,23 +44,24 @@ class ChannelSerializer(serializers.ModelSerializer):
         )
 
     def get_users(self, obj):
-        users = {}
-
-        for message in obj.messages.all():
-            user = message.user
-            serializer = UserSerializer(instance=user)
-            if user.api_id not in users:
-                users[user.api_id] = serializer.data
-
-            for reaction in message.reactions.all():
-                serializer = UserSerializer(instance=reaction.user)
-                if reaction.user.api_id not in users:
-                    users[reaction.user.api_id] = serializer.data
+        """
+        Everyone who posted or reacted in the channel, in one query.
+        """
+        users = User.objects.filter(
+            Q(pk__in=Message.objects.filter(channel=obj).values("user"))
+            | Q(
+                pk__in=Reaction.objects.filter(message__channel=obj).values(
+                    "user"
+                )
+            )
+        ).order_by("pk")
 
-        return users
+        return {
+            user.api_id: UserSerializer(instance=user).data for user in users
+        }
 
     def get_timestamp(self, obj):
-        return timezone.now()
+        return get_modified(obj)
 
     def get_meta(self, obj):
         return {
@@ -72,7 +74,11 @@ class ChannelSerializer(serializers.ModelSerializer):
         return obj.get_introduction()
 
     def get_messages(self, obj):
-        return [m.serialized for m in obj.messages.all()]
+        return list(
+            obj.messages.order_by("timestamp").values_list(
+                "serialized", flat=True
+            )
+        )
 
     class Meta:
         model = Channel
@@ -94,6 +100,17 @@ class ChannelSerializer(serializers.ModelSerializer):
         )
 
 
+class ChannelEnvelopeSerializer(ChannelSerializer):
+    """A channel without its messages, which are streamed after it."""
+
+    class Meta:
+        model = Channel
+        fields = tuple(
+            field for field in ChannelSerializer.Meta.fields
+            if field != "messages"
+        )
+
+
 class ChannelListSerializer(serializers.ModelSerializer):
     chat_type = serializers.SerializerMethodField()
 
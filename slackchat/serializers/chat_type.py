@@ -5,4 +5,4 @@ from slackchat.models import ChatType
 class ChatTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = ChatType
-        fields = '__all__'
+        exclude = ('modified',)
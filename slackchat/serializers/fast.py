@@ -0,0 +1,201 @@
+# Plain functions that build the same data as the DRF serializers,
+# without their per-instance overhead. Related rows should be
+# prefetched, as slackchat.reserialize does.
+import os
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+from slackchat.avatars import get_srcsets
+from slackchat.conf import settings
+from slackchat.models import Message, Reaction, User
+from slackchat.snapshots import get_modified
+
+from .attachment import AttachmentSerializer
+from .channel import ChannelSerializer
+from .message import MessageSerializer
+
+_datetime = serializers.DateTimeField()
+
+ATTACHMENT_FIELDS = AttachmentSerializer.Meta.fields
+
+
+def datetime_data(value):
+    if value is None:
+        return None
+    return _datetime.to_representation(value)
+
+
+def non_null(items):
+    """Same filtering as NoNonNullMixin."""
+    return OrderedDict((key, value) for key, value in items if value)
+
+
+def serialize_reaction(reaction):
+    return OrderedDict(
+        (
+            ("timestamp", datetime_data(reaction.timestamp)),
+            ("reaction", reaction.reaction),
+            ("user", reaction.user.api_id),
+        )
+    )
+
+
+def serialize_attachment(attachment):
+    return non_null(
+        (field, getattr(attachment, field)) for field in ATTACHMENT_FIELDS
+    )
+
+
+def serialize_user(user):
+    # As serializers.ImageField does without a request in context
+    image = None
+    if user.image:
+        if api_settings.UPLOADED_FILES_USE_URL:
+            try:
+                image = user.image.url
+            except AttributeError:
+                pass
+        else:
+            image = user.image.name
+
+    return OrderedDict(
+        (
+            ("first_name", user.first_name),
+            ("last_name", user.last_name),
+            ("image", image),
+            ("srcset", get_srcsets(user)),
+            ("title", user.title),
+        )
+    )
+
+
+def serialize_message(message):
+    if message.channel.chat_type.render_to_html:
+        content = message.html()
+    else:
+        content = message.get_content()
+
+    reactions = []
+    args = []
+    for reaction in message.reactions.all():
+        if reaction.argument_id is None:
+            reactions.append(serialize_reaction(reaction))
+        else:
+            args.append(reaction.argument.name)
+    args += message.get_custom_args()
+
+    kwargs = message.get_custom_kwargs() or {}
+    for kwarg in message.kwargs.all():
+        kwargs[kwarg.key] = kwarg.value
+
+    attachments = [
+        serialize_attachment(attachment)
+        for attachment in message.attachments.all()
+    ]
+    custom_attachment = message.get_custom_attachment()
+    if custom_attachment:
+        attachments.append(custom_attachment)
+
+    return non_null(
+        (
+            ("timestamp", datetime_data(message.timestamp)),
+            ("user", message.user.api_id),
+            ("content", content),
+            ("reactions", reactions),
+            ("attachments", attachments),
+            ("args", args),
+            ("kwargs", kwargs),
+        )
+    )
+
+
+def serialize_deleted_message(message):
+    """
+    Just enough of a deleted message for a renderer to find and remove
+    it. Reuses the message's last serialization where it can.
+    """
+    serialized = message.serialized or {}
+    user = serialized.get("user")
+    if user is None:
+        user = message.user.api_id
+    return OrderedDict(
+        (
+            ("timestamp", datetime_data(message.timestamp)),
+            ("user", user),
+        )
+    )
+
+
+def serialize_channel(channel):
+    chat_type = channel.chat_type
+
+    users = User.objects.filter(
+        Q(pk__in=Message.objects.filter(channel=channel).values("user"))
+        | Q(
+            pk__in=Reaction.objects.filter(message__channel=channel).values(
+                "user"
+            )
+        )
+    ).order_by("pk")
+
+    return OrderedDict(
+        (
+            ("id", str(channel.id)),
+            ("api_id", channel.api_id),
+            ("chat_type", chat_type.name),
+            ("title", channel.title),
+            ("introduction", channel.get_introduction()),
+            (
+                "meta",
+                {
+                    "title": channel.meta_title,
+                    "description": channel.meta_description,
+                    "image": channel.meta_image,
+                },
+            ),
+            ("extras", channel.extras),
+            (
+                "paths",
+                {
+                    "channel": channel.publish_path,
+                    "chat_type": chat_type.publish_path,
+                },
+            ),
+            (
+                "publish_path",
+                os.path.join(
+                    chat_type.publish_path, channel.publish_path.lstrip("/")
+                ),
+            ),
+            ("publish_time", datetime_data(channel.publish_time)),
+            ("live", channel.live),
+            ("users", {user.api_id: serialize_user(user) for user in users}),
+            (
+                "messages",
+                list(
+                    channel.messages.order_by("timestamp").values_list(
+                        "serialized", flat=True
+                    )
+                ),
+            ),
+            # As get_timestamp returns it, for the renderer to encode
+            ("timestamp", get_modified(channel)),
+        )
+    )
+
+
+def message_data(message):
+    """Serialize a message with the serializer the settings select."""
+    message.forget_template_matches()
+    if settings.FAST_SERIALIZERS:
+        return serialize_message(message)
+    return MessageSerializer(message).data
+
+
+def channel_data(channel):
+    """Serialize a channel with the serializer the settings select."""
+    if settings.FAST_SERIALIZERS:
+        return serialize_channel(channel)
+    return ChannelSerializer(channel).data
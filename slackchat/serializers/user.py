@@ -1,14 +1,21 @@
 from rest_framework import serializers
+from slackchat.avatars import get_srcsets
 from slackchat.models import User
 
 
 class UserSerializer(serializers.ModelSerializer):
+    srcset = serializers.SerializerMethodField()
+
+    def get_srcset(self, obj):
+        return get_srcsets(obj)
+
     class Meta:
         model = User
         fields = (
             'first_name',
             'last_name',
             'image',
+            'srcset',
             'title'
         )
 
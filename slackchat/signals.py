@@ -1,17 +1,26 @@
 from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from slackchat.serializers import MessageSerializer
+from django.utils import timezone
+from slackchat.cache import bump_version
+from slackchat.changes import record_change
+from slackchat.handlers.lookups import forget_channel, forget_user
+from slackchat.handlers.pending import replay
+from slackchat.notifications import notify
+from slackchat.reserialize import mark_dirty
+from slackchat.snapshots import invalidate_channel, invalidate_user_channels
+from slackchat.serializers.fast import serialize_deleted_message
 
 from .celery import (
     create_private_channel,
-    post_webhook,
     update_users,
     verify_webhook,
 )
 from .models import (
     Attachment,
     Channel,
+    ChatType,
+    CustomContentTemplate,
     KeywordArgument,
     Message,
     Reaction,
@@ -26,6 +35,35 @@ def save_channel(sender, instance, created, **kwargs):
         create_private_channel.delay(instance.pk)
 
 
+@receiver(post_save, sender=Channel)
+@receiver(post_delete, sender=Channel)
+def invalidate_channel_lookup(sender, instance, **kwargs):
+    forget_channel(instance.api_id)
+    pk = instance.pk
+    # Invalidate once the change is visible to whoever rebuilds
+    transaction.on_commit(lambda: invalidate_channel(pk, touch=False))
+
+
+@receiver(post_save, sender=ChatType)
+@receiver(post_delete, sender=ChatType)
+def invalidate_chat_types(sender, instance, **kwargs):
+    pk = instance.pk
+
+    def invalidate():
+        Channel.objects.filter(chat_type=pk).update(modified=timezone.now())
+        bump_version("chat-types")
+
+    # Invalidate once the change is visible to whoever rebuilds
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def invalidate_channel_snapshot(sender, instance, **kwargs):
+    channel_pk = instance.channel_id
+    transaction.on_commit(lambda: invalidate_channel(channel_pk))
+
+
 @receiver(post_save, sender=Webhook)
 def save_webhook(sender, instance, **kwargs):
     verify_webhook.delay(instance.pk)
@@ -34,7 +72,23 @@ def save_webhook(sender, instance, **kwargs):
 @receiver(post_save, sender=User)
 def new_user(sender, instance, created, **kwargs):
     if created:
-        update_users.delay([instance.pk])
+        pk = instance.pk
+        # The worker looks the user up, so wait until it can see them
+        transaction.on_commit(lambda: update_users.delay([pk]))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_users(sender, instance, **kwargs):
+    forget_user(instance.api_id)
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_user_channels([pk]))
+
+
+@receiver(post_save, sender=CustomContentTemplate)
+@receiver(post_delete, sender=CustomContentTemplate)
+def invalidate_content_templates(sender, instance, **kwargs):
+    bump_version("content-templates")
 
 
 @receiver(post_save, sender=Attachment)
@@ -44,14 +98,30 @@ def new_user(sender, instance, created, **kwargs):
 @receiver(post_save, sender=KeywordArgument)
 @receiver(post_delete, sender=KeywordArgument)
 def reserialize_message(sender, instance, **kwargs):
-    instance.message.serialize()
+    mark_dirty(instance.message_id)
+
+
+def get_chat_type(message):
+    """
+    The message's chat type name if it's already loaded. Otherwise
+    None, and the worker looks it up.
+    """
+    if Message.channel.is_cached(message):
+        channel = message.channel
+        if Channel.chat_type.is_cached(channel):
+            return channel.chat_type.name
+    return None
 
 
 @receiver(post_save, sender=Message)
 def notify_webhook(sender, instance, created, **kwargs):
-    channel_id = instance.channel.id.hex
-    message = MessageSerializer(instance=instance).data
-    chat_type = instance.channel.chat_type.name
+    channel_id = instance.channel_id.hex
+    chat_type = get_chat_type(instance)
+    # Message.save has just serialized the message. If it somehow
+    # hasn't, the worker reads it from the database instead, as do
+    # retries of the webhook.
+    message = instance.serialized or None
+    message_pk = instance.pk
 
     if created:
         update_type = "message_created"
@@ -59,17 +129,38 @@ def notify_webhook(sender, instance, created, **kwargs):
         update_type = "message_changed"
 
     transaction.on_commit(
-        lambda: post_webhook.delay(channel_id, chat_type, update_type, message)
+        lambda: notify(
+            channel_id, chat_type, update_type, message, message_pk
+        )
+    )
+
+
+@receiver(post_save, sender=Message)
+def replay_pending_events(sender, instance, created, **kwargs):
+    if created:
+        channel = instance.channel.api_id
+        ts = instance.timestamp.timestamp()
+        transaction.on_commit(lambda: replay(channel, ts))
+
+
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def log_message_change(sender, instance, **kwargs):
+    channel_pk = instance.channel_id
+    timestamp = instance.timestamp
+    deleted = kwargs["signal"] is post_delete
+    transaction.on_commit(
+        lambda: record_change(channel_pk, timestamp, deleted)
     )
 
 
 @receiver(post_delete, sender=Message)
 def notify_webhook_message_delete(sender, instance, **kwargs):
-    channel_id = instance.channel.id.hex
-    message = MessageSerializer(instance=instance).data
-    chat_type = instance.channel.chat_type.name
+    channel_id = instance.channel_id.hex
+    message = serialize_deleted_message(instance)
+    chat_type = get_chat_type(instance)
     update_type = "message_deleted"
 
     transaction.on_commit(
-        lambda: post_webhook.delay(channel_id, chat_type, update_type, message)
+        lambda: notify(channel_id, chat_type, update_type, message)
     )
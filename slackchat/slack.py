@@ -0,0 +1,123 @@
+import time
+
+import requests
+from slackchat.cache import get_cache, make_key
+from slackchat.conf import settings
+
+API_URL = "https://slack.com/api/{}"
+
+# Calls per minute Slack allows for each tier of Web API methods.
+# See https://api.slack.com/docs/rate-limits
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+METHOD_TIERS = {
+    "conversations.create": 2,
+    "conversations.invite": 3,
+    "groups.invite": 3,
+    "team.info": 3,
+    "users.info": 4,
+    "users.list": 2,
+}
+
+DEFAULT_TIER = 3
+
+# How many times a call is retried after Slack rate limits it
+MAX_RETRIES = 3
+
+# Seconds to wait for Slack to respond
+TIMEOUT = 30
+
+
+class SlackError(Exception):
+    pass
+
+
+class RateLimiter(object):
+    """
+    A bucket of calls per Slack method tier that refills every minute.
+
+    Buckets are counted in slackchat's cache, so every worker shares
+    them. With a local memory cache, each process counts its own.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache or get_cache()
+
+    def wait(self, tier):
+        """Block until a call in the tier is allowed, then take it."""
+        while True:
+            blocked = self.cache.get(make_key("slack-blocked", tier))
+            now = time.time()
+            if blocked and blocked > now:
+                time.sleep(blocked - now)
+                continue
+
+            window = int(now // 60)
+            key = make_key("slack-calls", tier, window)
+            self.cache.add(key, 0, 120)
+            try:
+                calls = self.cache.incr(key)
+            except ValueError:
+                # Evicted between add and incr
+                continue
+            if calls <= TIER_LIMITS[tier]:
+                return
+            time.sleep((window + 1) * 60 - now)
+
+    def block(self, tier, seconds):
+        """Hold every worker's calls in a tier, as Retry-After asks."""
+        self.cache.set(
+            make_key("slack-blocked", tier), time.time() + seconds, seconds
+        )
+
+
+class SlackAPI(object):
+    """
+    A Slack Web API client that keeps under Slack's rate limits.
+
+    Calls wait for their tier's bucket, and a rate-limited call waits
+    for as long as Slack's Retry-After header says, then tries again.
+    """
+
+    def __init__(self, token=None, limiter=None):
+        self.token = token or settings.SLACK_API_TOKEN
+        self.limiter = limiter or RateLimiter()
+        self.session = requests.Session()
+
+    def api_call(self, method, **params):
+        """Call a Web API method and return Slack's response body."""
+        tier = METHOD_TIERS.get(method, DEFAULT_TIER)
+        for retry in range(MAX_RETRIES + 1):
+            self.limiter.wait(tier)
+            response = self.session.post(
+                API_URL.format(method),
+                data=params,
+                headers={"Authorization": "Bearer {}".format(self.token)},
+                timeout=TIMEOUT,
+            )
+            if response.status_code != requests.codes.too_many:
+                break
+            if retry < MAX_RETRIES:
+                self.limiter.block(
+                    tier, int(response.headers.get("Retry-After", 1))
+                )
+        response.raise_for_status()
+        return response.json()
+
+    def call(self, method, **params):
+        """Like api_call, but raises a SlackError unless it's ok."""
+        body = self.api_call(method, **params)
+        if not body.get("ok", False):
+            raise SlackError(body.get("error", "unknown_error"))
+        return body
+
+
+_client = None
+
+
+def get_client():
+    """Return this process's shared Slack client."""
+    global _client
+    if _client is None:
+        _client = SlackAPI()
+    return _client
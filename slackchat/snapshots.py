@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import time
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from slackchat.cache import bump_version, get_cache, get_version, make_key
+from slackchat.conf import settings
+from slackchat.renderers import get_json_renderer
+from slackchat.streaming import should_stream, stream_channel
+
+# How long a worker may hold the lock while it rebuilds a snapshot
+LOCK_TIMEOUT = 30
+
+
+def normalize_pk(pk):
+    """
+    Return a channel pk in the one form cache keys are built from, as
+    URLs and webhooks may give it with or without hyphens. Returns None
+    if it isn't a UUID at all.
+    """
+    try:
+        return str(uuid.UUID(str(pk)))
+    except ValueError:
+        return None
+
+
+def get_channel_version(pk):
+    """
+    Return a version that changes whenever anything in a channel's
+    serialized payload changes.
+    """
+    pk = normalize_pk(pk)
+    return "{}.{}.{}".format(
+        get_version("channel:{}".format(pk)),
+        get_version("users"),
+        get_version("chat-types"),
+    )
+
+
+def invalidate_channel(pk, touch=True):
+    """
+    Mark a channel as changed.
+
+    Unless the channel row itself was just saved, the time of the change
+    is also recorded, in the cache rather than on the row, as a change
+    to the channel's messages doesn't otherwise touch it.
+    """
+    pk = normalize_pk(pk)
+    if touch:
+        get_cache().set(make_key("channel-changed", pk), timezone.now(), None)
+    bump_version("channel:{}".format(pk))
+
+
+def get_modified(channel):
+    """
+    The last time anything in a channel's serialization changed, which
+    is its timestamp and Last-Modified.
+    """
+    changed = get_cache().get(
+        make_key("channel-changed", normalize_pk(channel.pk))
+    )
+    if changed is not None and changed > channel.modified:
+        return changed
+    return channel.modified
+
+
+def invalidate_user_channels(pks):
+    """Mark every channel the given users posted or reacted in as changed."""
+    from slackchat.models import Channel
+
+    Channel.objects.filter(
+        Q(messages__user__in=pks) | Q(messages__reactions__user__in=pks)
+    ).update(modified=timezone.now())
+    bump_version("users")
+
+
+def build_snapshot(pk, version):
+    from slackchat.models import Channel
+    from slackchat.serializers.fast import channel_data
+
+    try:
+        channel = Channel.objects.select_related("chat_type").get(pk=pk)
+    except (Channel.DoesNotExist, ValidationError, ValueError):
+        return None
+
+    snapshot = {
+        "version": version,
+        "modified": get_modified(channel).timestamp(),
+        "live": channel.live,
+    }
+
+    if should_stream(channel):
+        # Too big to hold in memory. Only remember that it's streamed.
+        snapshot["stream"] = True
+        snapshot["etag"] = '"{}"'.format(
+            hashlib.sha1(version.encode("utf-8")).hexdigest()
+        )
+    else:
+        body = get_json_renderer()().render(channel_data(channel))
+        snapshot["body"] = body
+        snapshot["etag"] = '"{}"'.format(hashlib.sha1(body).hexdigest())
+        if settings.PRECOMPRESS:
+            # Compressed once here rather than on every response
+            snapshot["gzip"] = gzip.compress(body)
+    get_cache().set(
+        make_key("snapshot", pk), snapshot, settings.SNAPSHOT_TTL
+    )
+    return snapshot
+
+
+def get_snapshot(pk, version=None):
+    """
+    Return a channel's serialized payload as prebuilt JSON bytes, or
+    None if the channel doesn't exist.
+
+    If a version is given, a snapshot of that version is good enough
+    even if the channel has changed since.
+
+    Only one worker rebuilds an out-of-date snapshot at a time. The
+    others serve the previous snapshot meanwhile, or wait for the new
+    one if there is none.
+    """
+    pk = normalize_pk(pk)
+    if pk is None:
+        return None
+
+    cache = get_cache()
+    key = make_key("snapshot", pk)
+
+    snapshot = cache.get(key)
+    if snapshot and version is not None and snapshot["version"] == version:
+        return snapshot
+
+    version = get_channel_version(pk)
+    if snapshot and snapshot["version"] == version:
+        return snapshot
+
+    lock = make_key("snapshot-lock", pk)
+    if cache.add(lock, True, LOCK_TIMEOUT):
+        try:
+            return build_snapshot(pk, version)
+        finally:
+            cache.delete(lock)
+
+    if snapshot:
+        return snapshot
+
+    for _ in range(20):
+        time.sleep(0.1)
+        snapshot = cache.get(key)
+        if snapshot and snapshot["version"] == version:
+            return snapshot
+
+    return build_snapshot(pk, version)
+
+
+def get_channel_json(pk, version=None):
+    """
+    Return a channel's serialized payload as a JSON string, or None if
+    the channel doesn't exist.
+    """
+    from slackchat.models import Channel
+
+    snapshot = get_snapshot(pk, version)
+    if snapshot is None:
+        return None
+    if not snapshot.get("stream"):
+        return snapshot["body"].decode("utf-8")
+
+    channel = Channel.objects.select_related("chat_type").filter(pk=pk).first()
+    if channel is None:
+        return None
+    return b"".join(stream_channel(channel)).decode("utf-8")
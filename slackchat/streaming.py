@@ -0,0 +1,34 @@
+from slackchat.conf import settings
+from slackchat.renderers import get_json_renderer
+
+
+def stream_channel(channel):
+    """
+    Yield a channel's serialized JSON in pieces.
+
+    The envelope is rendered first, then each message's prebuilt
+    serialization is read from the database in chunks, so memory use
+    doesn't grow with the number of messages.
+    """
+    from slackchat.serializers import ChannelEnvelopeSerializer
+
+    renderer = get_json_renderer()()
+    envelope = renderer.render(ChannelEnvelopeSerializer(channel).data)
+
+    # Reopen the envelope object to append the messages to it
+    yield envelope[:-1] + b',"messages":['
+
+    messages = (
+        channel.messages.order_by("timestamp")
+        .values_list("serialized", flat=True)
+        .iterator(chunk_size=settings.STREAMING_CHUNK_SIZE)
+    )
+    for i, message in enumerate(messages):
+        yield (b"," if i else b"") + renderer.render(message)
+
+    yield b"]}"
+
+
+def should_stream(channel):
+    threshold = settings.STREAMING_THRESHOLD
+    return threshold is not None and channel.messages.count() > threshold
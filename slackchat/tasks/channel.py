@@ -1,13 +1,14 @@
 from celery import shared_task
+from slackchat.changes import prune
 from slackchat.conf import settings
 from slackchat.models import Channel
-from slackclient import SlackClient
+from slackchat.slack import get_client
 
 
 @shared_task(acks_late=True)
 def create_private_channel(pk):
     instance = Channel.objects.get(pk=pk)
-    client = SlackClient(settings.SLACK_API_TOKEN)
+    client = get_client()
     response = client.api_call(
         "conversations.create",
         name="slackchat-{}".format(instance.id.hex[:10]),
@@ -35,3 +36,8 @@ def create_private_channel(pk):
             )
 
     instance.save()
+
+
+@shared_task(acks_late=True)
+def prune_channel_changes():
+    prune()
@@ -0,0 +1,13 @@
+from celery import shared_task
+from slackchat.handlers import handle_event
+from slackchat.handlers.dedupe import prune
+
+
+@shared_task(acks_late=True)
+def process_event(id, event):
+    handle_event(id, event)
+
+
+@shared_task(acks_late=True)
+def prune_processed_events():
+    prune()
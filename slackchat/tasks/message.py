@@ -0,0 +1,10 @@
+from celery import shared_task
+from slackchat.cache import get_cache, make_key
+from slackchat.reserialize import reserialize
+
+
+@shared_task(acks_late=True)
+def reserialize_messages(pks):
+    # Changes from here on schedule a new reserialization
+    get_cache().delete_many([make_key("reserialize", pk) for pk in pks])
+    reserialize(pks)
@@ -1,17 +1,40 @@
 import re
 import uuid
-import json
 
 import requests
 
 from celery import shared_task
 from slackchat.conf import settings
-from slackchat.models import Webhook
-from django.core.serializers.json import DjangoJSONEncoder
+from slackchat.delivery import attempt, deliver, encode, replay, superseded
+from slackchat.models import Channel, Webhook
+from slackchat.notifications import (
+    GAP_RETRY,
+    collapse,
+    get_serialized,
+    take_batch,
+)
+from slackchat.snapshots import get_channel_json
+from slackchat.utils import log_event
 
 
-@shared_task(acks_late=True)
-def post_webhook(channel_id, chat_type, update_type=None, message=None):
+def build_update(
+    channel_id,
+    chat_type,
+    update_type=None,
+    message=None,
+    changes=None,
+    message_pk=None,
+):
+    if chat_type is None:
+        chat_type = (
+            Channel.objects.filter(pk=channel_id)
+            .values_list("chat_type__name", flat=True)
+            .first()
+        )
+
+    if message is None and message_pk is not None:
+        message = get_serialized([message_pk]).get(message_pk)
+
     data = {
         "token": settings.WEBHOOK_VERIFICATION_TOKEN,
         "type": "update_notification",
@@ -27,37 +50,136 @@ def post_webhook(channel_id, chat_type, update_type=None, message=None):
     if message:
         data["message"] = message
 
-    for webhook in Webhook.objects.all():
-        if webhook.verified:
-            requests.post(webhook.endpoint, json=data)
+    if changes is not None:
+        data["changes"] = changes
+
+    return data
+
+
+def rebuild_update(channel_id, chat_type, update_type, message_pk):
+    """A message's update, as it is now, or None if it's been deleted."""
+    message = get_serialized([message_pk]).get(message_pk)
+    if not message:
+        return None
+    return build_update(channel_id, chat_type, update_type, message)
 
 
 @shared_task(acks_late=True)
-def post_webhook_republish(channel, chat_type):
-    data = {
-        "token": settings.WEBHOOK_VERIFICATION_TOKEN,
-        "type": "republish_request",
-        "channel": channel["id"],
-        "channel_data": json.dumps(channel, cls=DjangoJSONEncoder),
-        "chat_type": chat_type,
-    }
-    for webhook in Webhook.objects.all():
-        if webhook.verified:
-            requests.post(webhook.endpoint, json=data)
+def post_webhook(
+    channel_id,
+    chat_type,
+    update_type=None,
+    message=None,
+    changes=None,
+    message_pk=None,
+):
+    data = build_update(
+        channel_id, chat_type, update_type, message, changes, message_pk
+    )
+
+    ref = None
+    if message_pk is not None and update_type != "message_deleted":
+        # Retries resend the message as it is by then, and give way to
+        # any later update of it
+        ref = {
+            "source": "update",
+            "args": [channel_id, data["chat_type"], update_type, message_pk],
+            "subject": "message:{}".format(message_pk),
+        }
+
+    deliver(data, ref=ref)
 
 
 @shared_task(acks_late=True)
-def post_webhook_unpublish(channel, chat_type):
-    data = {
+def flush_webhook_batch(channel_id, chat_type):
+    batch = take_batch(channel_id)
+    if batch is None:
+        return
+    updates, complete = batch
+    if not complete:
+        flush_webhook_batch.apply_async(
+            (channel_id, chat_type), countdown=GAP_RETRY
+        )
+    if not updates:
+        return
+    changes = collapse(updates)
+    if changes:
+        post_webhook(channel_id, chat_type, "batch", changes=changes)
+
+
+def build_channel_request(type, channel_pk, chat_type, version):
+    channel_data = get_channel_json(channel_pk, version)
+    if channel_data is None:
+        return None
+
+    return {
         "token": settings.WEBHOOK_VERIFICATION_TOKEN,
-        "type": "unpublish_request",
-        "channel": channel["id"],
-        "channel_data": json.dumps(channel, cls=DjangoJSONEncoder),
+        "type": type,
+        "channel": str(channel_pk),
+        "channel_data": channel_data,
         "chat_type": chat_type,
     }
-    for webhook in Webhook.objects.all():
-        if webhook.verified:
-            requests.post(webhook.endpoint, json=data)
+
+
+def post_channel_request(type, channel_pk, chat_type, version):
+    if isinstance(channel_pk, dict):
+        # Queued before tasks took a channel pk
+        channel_pk = channel_pk["id"]
+
+    data = build_channel_request(type, channel_pk, chat_type, version)
+    if data is None:
+        return
+
+    # Retries fetch the channel's payload again, at this version if it's
+    # still cached or else as it is by then. A later republish or
+    # unpublish of the channel supersedes them.
+    deliver(
+        data,
+        ref={
+            "source": "channel",
+            "args": [type, str(channel_pk), chat_type, version],
+            "subject": "channel:{}".format(channel_pk),
+        },
+    )
+
+
+# How retries rebuild the payloads of deliveries with a ref
+SOURCES = {"update": rebuild_update, "channel": build_channel_request}
+
+
+@shared_task(acks_late=True)
+def post_webhook_republish(channel_pk, chat_type, version=None):
+    post_channel_request("republish_request", channel_pk, chat_type, version)
+
+
+@shared_task(acks_late=True)
+def post_webhook_unpublish(channel_pk, chat_type, version=None):
+    post_channel_request("unpublish_request", channel_pk, chat_type, version)
+
+
+@shared_task(acks_late=True)
+def retry_webhook(pk, body, attempts, ref=None):
+    webhook = Webhook.objects.filter(pk=pk, verified=True).first()
+    if not webhook:
+        return
+
+    if ref is not None:
+        if superseded(ref):
+            log_event("WEBHOOK_SUPERSEDED", ref["subject"])
+            return
+        data = SOURCES[ref["source"]](*ref["args"])
+        if data is None:
+            return
+        body = encode(data)
+
+    attempt(webhook, body, attempts, ref)
+
+
+@shared_task(acks_late=True)
+def replay_dead_letters(pk):
+    webhook = Webhook.objects.filter(pk=pk).first()
+    if webhook:
+        replay(webhook)
 
 
 def clean_response(response):
@@ -79,6 +201,7 @@ def verify_webhook(pk):
                 "type": "url_verification",
                 "challenge": challenge,
             },
+            timeout=settings.WEBHOOK_TIMEOUT,
         )
         if response.status_code == requests.codes.ok:
             if clean_response(response.text) == challenge:
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from slackchat.changes import get_changes, get_cursor, prune
+from slackchat.models import Channel, ChannelChange
+
+from .utils import SlackchatTestCase
+
+
+class ChangesTest(SlackchatTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.busy = Channel.objects.create(
+            api_id="G2", chat_type=self.chat_type, owner=self.owner
+        )
+
+    def log(self, channel, age):
+        change = ChannelChange.objects.create(
+            channel=channel, timestamp=self.tick()
+        )
+        ChannelChange.objects.filter(pk=change.pk).update(
+            created=timezone.now() - timedelta(seconds=age)
+        )
+        return change
+
+    def test_quiet_channel_after_a_prune(self):
+        self.log(self.busy, 60 * 60 * 48)
+        kept = self.log(self.busy, 60)
+        self.assertEqual(prune(), 1)
+
+        # A channel with nothing logged gets a cursor it can use
+        cursor = get_cursor(self.channel.pk)
+        self.assertLess(cursor, kept.pk)
+        changes = get_changes(self.channel.pk, cursor)
+        self.assertFalse(changes["reset"])
+        self.assertEqual(changes["cursor"], cursor)
+
+    def test_reset_cursor_after_a_prune(self):
+        old = self.log(self.busy, 60 * 60 * 48)
+        self.log(self.busy, 60 * 60 * 48)
+        prune()
+
+        changes = get_changes(self.channel.pk, old.pk)
+        self.assertTrue(changes["reset"])
+        changes = get_changes(self.channel.pk, changes["cursor"])
+        self.assertFalse(changes["reset"])
+
+    def test_changes(self):
+        first = self.log(self.channel, 60)
+        second = self.log(self.channel, 60)
+        self.assertEqual(get_cursor(self.channel.pk), second.pk)
+        changes = get_changes(self.channel.pk, first.pk)
+        self.assertFalse(changes["reset"])
+        self.assertEqual(changes["cursor"], second.pk)
+        self.assertEqual(
+            changes["deleted"], [{"timestamp": second.timestamp}]
+        )
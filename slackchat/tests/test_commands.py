@@ -0,0 +1,33 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from slackchat.cache import get_version
+from slackchat.models import User
+
+
+class GetSlackchatUsersTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def sync(self, roster):
+        with mock.patch(
+            "slackchat.management.commands.get_slackchat_users.get_roster",
+            return_value=roster,
+        ):
+            call_command("get_slackchat_users", stdout=StringIO())
+
+    def test_new_users_bump_the_users_version(self):
+        version = get_version("users")
+        self.sync({"U1": {"real_name": "Ada Lovelace", "title": "Editor"}})
+        self.assertEqual(User.objects.get().api_id, "U1")
+        self.assertNotEqual(get_version("users"), version)
+
+    def test_unchanged_users_leave_it(self):
+        roster = {"U1": {"real_name": "Ada Lovelace", "title": "Editor"}}
+        self.sync(roster)
+        version = get_version("users")
+        self.sync(roster)
+        self.assertEqual(get_version("users"), version)
@@ -0,0 +1,126 @@
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from slackchat.models import DeadLetter, Webhook
+from slackchat.tasks.webhook import (
+    post_webhook,
+    post_webhook_republish,
+    retry_webhook,
+)
+
+from .utils import SlackchatTestCase
+
+
+class RetryTest(SlackchatTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        with mock.patch("slackchat.signals.verify_webhook"):
+            self.webhook = Webhook.objects.create(
+                endpoint="http://example.com/hook", verified=True
+            )
+
+        patcher = mock.patch("slackchat.tasks.webhook.retry_webhook")
+        self.retry = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fail(self, deliver):
+        """Deliver something that fails, and return its retry's args."""
+        with mock.patch("slackchat.delivery.post") as post:
+            post.return_value.ok = False
+            post.return_value.status_code = 500
+            deliver()
+        self.assertEqual(self.retry.apply_async.call_count, 1)
+        args = self.retry.apply_async.call_args[0][0]
+        self.retry.reset_mock()
+        return args
+
+    def run_retry(self, args):
+        """Run a retry and return the body it posted, if any."""
+        with mock.patch("slackchat.delivery.post") as post:
+            post.return_value.ok = True
+            retry_webhook(*args)
+        if post.called:
+            return json.loads(post.call_args[0][1])
+        return None
+
+    def post_update(self):
+        post_webhook(
+            self.channel.id.hex,
+            "basic",
+            "message_changed",
+            self.plain.serialized,
+            message_pk=self.plain.pk,
+        )
+
+    def test_update_retries_carry_a_reference(self):
+        pk, body, attempts, ref = self.fail(self.post_update)
+        self.assertEqual(pk, self.webhook.pk)
+        self.assertIsNone(body)
+        self.assertEqual(attempts, 1)
+        self.assertEqual(ref["args"][-1], self.plain.pk)
+
+    def test_update_retries_send_the_message_as_it_is(self):
+        args = self.fail(self.post_update)
+        self.plain.text = "Edited"
+        self.plain.save()
+        data = self.run_retry(args)
+        self.assertEqual(data["update_type"], "message_changed")
+        self.assertEqual(data["message"]["content"], "<p>Edited</p>")
+
+    def test_update_retries_of_deleted_messages_are_dropped(self):
+        args = self.fail(self.post_update)
+        self.plain.delete()
+        self.assertIsNone(self.run_retry(args))
+
+    def test_superseded_retries_are_dropped(self):
+        first = self.fail(self.post_update)
+        second = self.fail(self.post_update)
+        self.assertIsNone(self.run_retry(first))
+        self.assertIsNotNone(self.run_retry(second))
+
+    def test_retries_without_a_reference_carry_the_body(self):
+        def post_batch():
+            post_webhook(
+                self.channel.id.hex,
+                "basic",
+                "batch",
+                changes=[{"update_type": "message_created"}],
+            )
+
+        pk, body, attempts, ref = self.fail(post_batch)
+        self.assertIsNone(ref)
+        self.assertEqual(
+            json.loads(body)["changes"], [{"update_type": "message_created"}]
+        )
+        self.assertEqual(
+            self.run_retry((pk, body, attempts, ref)), json.loads(body)
+        )
+
+    def test_channel_request_retries(self):
+        def republish():
+            post_webhook_republish(str(self.channel.pk), "basic")
+
+        first = self.fail(republish)
+        self.assertIsNone(first[1])
+        self.assertEqual(first[3]["args"][1], str(self.channel.pk))
+
+        second = self.fail(republish)
+        self.assertIsNone(self.run_retry(first))
+        data = self.run_retry(second)
+        self.assertEqual(data["type"], "republish_request")
+        self.assertEqual(
+            json.loads(data["channel_data"])["api_id"], self.channel.api_id
+        )
+
+    def test_last_retry_is_dead_lettered_with_its_body(self):
+        args = self.fail(self.post_update)
+        with mock.patch("slackchat.delivery.post") as post, mock.patch(
+            "slackchat.delivery.settings.WEBHOOK_RETRIES", 0
+        ):
+            post.return_value.ok = False
+            post.return_value.status_code = 500
+            retry_webhook(*args)
+        letter = DeadLetter.objects.get()
+        self.assertEqual(letter.payload["message"], self.plain.serialized)
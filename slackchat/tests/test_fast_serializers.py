@@ -0,0 +1,85 @@
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from slackchat.serializers import ChannelSerializer, MessageSerializer
+from slackchat.serializers.fast import serialize_channel, serialize_message
+
+from .utils import SlackchatTestCase
+
+
+@override_settings(MEDIA_URL="/media/")
+class FastSerializerParityTest(SlackchatTestCase):
+    """The fast serializers must output what the DRF ones do, byte for
+    byte."""
+
+    def assertSameJSON(self, fast, slow):
+        render = JSONRenderer().render
+        self.assertEqual(render(fast), render(slow))
+
+    def assertMessagesMatch(self):
+        for message in self.get_messages():
+            with self.subTest(text=message.text):
+                self.assertSameJSON(
+                    serialize_message(message), MessageSerializer(message).data
+                )
+
+    def assertChannelsMatch(self):
+        channel = self.get_channel()
+        self.assertSameJSON(
+            serialize_channel(channel), ChannelSerializer(channel).data
+        )
+
+    def test_messages(self):
+        self.assertMessagesMatch()
+
+    def test_messages_without_html(self):
+        self.chat_type.render_to_html = False
+        self.chat_type.save()
+        self.assertMessagesMatch()
+
+    def test_channel(self):
+        self.assertChannelsMatch()
+
+    def test_channel_without_html(self):
+        self.chat_type.render_to_html = False
+        self.chat_type.save()
+        self.assertChannelsMatch()
+
+    @override_settings(REST_FRAMEWORK={"UPLOADED_FILES_USE_URL": False})
+    def test_channel_with_file_names(self):
+        self.assertChannelsMatch()
+
+    def test_templated_message(self):
+        message = self.get_messages().get(pk=self.templated.pk)
+        data = serialize_message(message)
+        self.assertEqual(data["content"], "<p>All <strong>clear</strong></p>")
+        self.assertEqual(data["args"], ["alert", "alert-red"])
+        self.assertEqual(
+            data["kwargs"], {"alert-type": "red", "level": "3"}
+        )
+        self.assertEqual(
+            data["attachments"], [{"title": "Alert!", "text": "red"}]
+        )
+
+    def test_channel_users(self):
+        users = serialize_channel(self.get_channel())["users"]
+        self.assertEqual(list(users), ["U1", "U2", "U3"])
+        self.assertEqual(
+            users["U1"]["srcset"],
+            {
+                "jpeg": (
+                    "/media/slackchat/avatars/ab/abc-48.jpg 48w, "
+                    "/media/slackchat/avatars/ab/abc-96.jpg 96w"
+                ),
+                "webp": "/media/slackchat/avatars/ab/abc-48.webp 48w",
+            },
+        )
+        self.assertEqual(
+            users["U3"],
+            {
+                "first_name": None,
+                "last_name": None,
+                "image": None,
+                "srcset": {},
+                "title": "",
+            },
+        )
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from slackchat.conf import settings
+from slackchat.models import message as message_module
+from slackchat.serializers import ChannelSerializer, MessageSerializer
+from slackchat.serializers.fast import (
+    message_data,
+    serialize_channel,
+    serialize_message,
+)
+
+from .utils import SlackchatTestCase
+
+
+class SerializationQueriesTest(SlackchatTestCase):
+    """
+    Serializing takes a fixed number of queries, however many messages,
+    reactions and users a channel has.
+    """
+
+    # The users who posted or reacted, and the serialized messages
+    CHANNEL_QUERIES = 2
+    # Messages, then their reactions, reacting users, arguments,
+    # attachments and kwargs
+    MESSAGES_QUERIES = 6
+
+    def add_messages(self):
+        for n in range(10):
+            message = self.post(self.reader, "Message {}".format(n))
+            self.react(message, self.owner)
+
+    def assertChannelQueries(self):
+        channel = self.get_channel()
+        with self.assertNumQueries(self.CHANNEL_QUERIES):
+            serialize_channel(channel)
+
+        channel = self.get_channel()
+        with self.assertNumQueries(self.CHANNEL_QUERIES):
+            ChannelSerializer(channel).data
+
+    def assertMessagesQueries(self):
+        with self.assertNumQueries(self.MESSAGES_QUERIES):
+            for message in self.get_messages():
+                serialize_message(message)
+
+        with self.assertNumQueries(self.MESSAGES_QUERIES):
+            for message in self.get_messages():
+                MessageSerializer(message).data
+
+    def test_channel(self):
+        self.assertChannelQueries()
+
+    def test_channel_with_more_messages(self):
+        self.add_messages()
+        self.assertChannelQueries()
+
+    def test_messages(self):
+        self.assertMessagesQueries()
+
+    def test_messages_with_more_messages(self):
+        self.add_messages()
+        self.assertMessagesQueries()
+
+    def test_templates_read_once(self):
+        # Each read checks the templates' version in the shared cache
+        for fast in (True, False):
+            with self.subTest(fast=fast), mock.patch.object(
+                settings, "FAST_SERIALIZERS", fast
+            ), mock.patch.object(
+                message_module,
+                "get_compiled_templates",
+                wraps=message_module.get_compiled_templates,
+            ) as get_compiled_templates:
+                for message in self.get_messages():
+                    message_data(message)
+                    message_data(message)
+                self.assertEqual(get_compiled_templates.call_count, 8)
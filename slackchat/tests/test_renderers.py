@@ -0,0 +1,40 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from slackchat.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def assertRendersLikeDRF(self, data):
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_matches_drf(self):
+        self.assertRendersLikeDRF(
+            OrderedDict(
+                (
+                    ("text", "caf\u00e9 \u2028\u2029 </script>"),
+                    ("timestamp", datetime(2018, 1, 2, tzinfo=timezone.utc)),
+                    ("numbers", [0, -1, 2 ** 63 - 1, 0.5, True, None]),
+                    ("nested", {"a": [{"b": {}}]}),
+                )
+            )
+        )
+
+    def test_non_str_keys(self):
+        self.assertRendersLikeDRF(
+            {1: "one", None: "none", False: "no", 2.5: "half"}
+        )
+
+    def test_big_integers(self):
+        self.assertRendersLikeDRF({"big": 2 ** 64, "small": -(2 ** 70)})
+
+    def test_indent(self):
+        renderer = FastJSONRenderer()
+        self.assertEqual(
+            renderer.render({"a": 1}, renderer_context={"indent": 2}),
+            JSONRenderer().render({"a": 1}, renderer_context={"indent": 2}),
+        )
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test import TestCase
+from slackchat.reserialize import mark_dirty
+
+
+class MarkDirtyTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch("slackchat.reserialize.flush")
+        self.flush = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_hooks(self):
+        """Run the hooks waiting for the test's transaction to commit."""
+        hooks = [hook for _, hook in connection.run_on_commit]
+        connection.run_on_commit = []
+        for hook in hooks:
+            hook()
+        return [call[0][0] for call in self.flush.call_args_list]
+
+    def test_once_per_transaction(self):
+        mark_dirty(1)
+        mark_dirty(2)
+        mark_dirty(1)
+        self.assertEqual(self.run_hooks(), [{1, 2}])
+
+    def test_rolled_back(self):
+        try:
+            with transaction.atomic():
+                mark_dirty(1)
+                raise ValueError
+        except ValueError:
+            pass
+        mark_dirty(2)
+        self.assertEqual(self.run_hooks(), [{2}])
+
+    def test_after_commit(self):
+        mark_dirty(1)
+        self.assertEqual(self.run_hooks(), [{1}])
+        mark_dirty(2)
+        self.assertEqual(self.run_hooks(), [{1}, {2}])
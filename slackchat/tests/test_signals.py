@@ -0,0 +1,18 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from slackchat.models import User
+
+
+class NewUserTest(TestCase):
+    @mock.patch("slackchat.signals.update_users")
+    def test_updated_once_committed(self, update_users):
+        user = User.objects.create(api_id="U1")
+        update_users.delay.assert_not_called()
+
+        hooks = [hook for _, hook in connection.run_on_commit]
+        connection.run_on_commit = []
+        for hook in hooks:
+            hook()
+        update_users.delay.assert_called_once_with([user.pk])
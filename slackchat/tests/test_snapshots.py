@@ -0,0 +1,84 @@
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from slackchat.snapshots import get_modified, invalidate_channel
+
+from .utils import SlackchatTestCase
+
+
+class ModifiedTest(SlackchatTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_channel_modified(self):
+        channel = self.get_channel()
+        self.assertEqual(get_modified(channel), channel.modified)
+
+    def test_message_changes_leave_the_channel_row_alone(self):
+        channel = self.get_channel()
+        with self.assertNumQueries(0):
+            invalidate_channel(channel.pk)
+        self.assertGreater(get_modified(channel), channel.modified)
+        self.assertEqual(self.get_channel().modified, channel.modified)
+
+    def test_channel_saved_since(self):
+        invalidate_channel(self.channel.pk)
+        self.channel.save()
+        channel = self.get_channel()
+        self.assertEqual(get_modified(channel), channel.modified)
+
+    def test_row_modified_later_than_cache(self):
+        channel = self.get_channel()
+        channel.modified += timedelta(days=1)
+        invalidate_channel(channel.pk)
+        self.assertEqual(get_modified(channel), channel.modified)
+
+
+@override_settings(ROOT_URLCONF="slackchat.urls")
+class ChannelSnapshotTest(SlackchatTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def fetch(self, pk):
+        response = self.client.get(
+            reverse("slackchat-channel-detail", args=[pk]),
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def get_content(self, data):
+        return [message.get("content") for message in data["messages"]]
+
+    def test_invalidated_by_any_form_of_the_pk(self):
+        # Webhooks give renderers the pk without hyphens
+        for pk in (self.channel.pk.hex, str(self.channel.pk)):
+            with self.subTest(pk=pk):
+                self.plain.text = "Before {}".format(pk)
+                self.plain.save()
+                invalidate_channel(self.plain.channel_id)
+                self.assertIn(
+                    "<p>Before {}</p>".format(pk),
+                    self.get_content(self.fetch(pk)),
+                )
+
+                self.plain.text = "After {}".format(pk)
+                self.plain.save()
+                # As the signal does once the save commits
+                invalidate_channel(self.plain.channel_id)
+                self.assertIn(
+                    "<p>After {}</p>".format(pk),
+                    self.get_content(self.fetch(pk)),
+                )
+
+    def test_not_a_uuid(self):
+        response = self.client.get(
+            reverse("slackchat-channel-detail", args=["nope"]),
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,62 @@
+import time
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.utils.http import http_date
+from rest_framework.renderers import JSONRenderer
+from slackchat.viewsets import ConditionalMixin, accepts_gzip
+
+
+class AcceptsGzipTest(SimpleTestCase):
+    def accepts(self, header):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header)
+        return accepts_gzip(request)
+
+    def test_accepted(self):
+        for header in (
+            "gzip",
+            "deflate, gzip;q=1.0, *;q=0.5",
+            "br;q=1, GZIP ; q=0.2",
+            "*",
+            "br, *;q=0.1",
+        ):
+            with self.subTest(header=header):
+                self.assertTrue(self.accepts(header))
+
+    def test_refused(self):
+        for header in (
+            "",
+            "identity",
+            "gzip;q=0",
+            "gzip; q=0.000, *",
+            "*;q=0",
+            "gzip;q=nonsense",
+            "x-gzipped",
+        ):
+            with self.subTest(header=header):
+                self.assertFalse(self.accepts(header))
+
+
+class ConditionalTest(SimpleTestCase):
+    def get(self, last_modified, **headers):
+        request = RequestFactory().get("/", **headers)
+        request.accepted_renderer = JSONRenderer()
+        return ConditionalMixin().conditional(
+            request, '"etag"', last_modified, 60, HttpResponse
+        )
+
+    def test_last_modified_rounds_up(self):
+        response = self.get(1000.2)
+        self.assertEqual(response["Last-Modified"], http_date(1001))
+
+    def test_last_modified_left_out_until_its_second_is_over(self):
+        response = self.get(time.time())
+        self.assertFalse(response.has_header("Last-Modified"))
+
+    def test_if_modified_since(self):
+        since = self.get(1000.2)["Last-Modified"]
+        response = self.get(1000.2, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 304)
+        # Sent once 1001 was over, so any later change is later still
+        response = self.get(1001.1, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
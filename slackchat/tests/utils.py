@@ -0,0 +1,152 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from slackchat.models import (
+    Argument,
+    Attachment,
+    Channel,
+    ChatType,
+    CustomContentTemplate,
+    KeywordArgument,
+    Message,
+    Reaction,
+    User,
+)
+
+
+class SlackchatTestCase(TestCase):
+    """
+    Builds a channel with one of everything a message can carry,
+    without the Slack and webhook tasks models queue when saved.
+    """
+
+    def setUp(self):
+        for task in ("create_private_channel", "update_users"):
+            patcher = mock.patch("slackchat.signals.{}".format(task))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.now = timezone.now()
+        self.ticks = 0
+
+        self.chat_type = ChatType.objects.create(
+            name="basic", publish_path="/chats/", render_to_html=True
+        )
+        self.owner = User.objects.create(
+            api_id="U1",
+            first_name="Ada",
+            last_name="Lovelace",
+            title="Reporter",
+            image="slackchat/avatars/ab/abc.jpg",
+            image_hash="abc",
+            image_variants={
+                "jpeg": {
+                    "96": "slackchat/avatars/ab/abc-96.jpg",
+                    "48": "slackchat/avatars/ab/abc-48.jpg",
+                },
+                "webp": {"48": "slackchat/avatars/ab/abc-48.webp"},
+            },
+        )
+        self.reader = User.objects.create(api_id="U2", first_name="Grace")
+        # What's left of a user Slack has deleted
+        self.deleted = User.objects.create(api_id="U3")
+        self.channel = Channel.objects.create(
+            api_id="G1",
+            chat_type=self.chat_type,
+            owner=self.owner,
+            title="A chat",
+            introduction="Read **this**",
+            meta_title="Meta",
+            extras={"theme": "dark"},
+            publish_time=self.now,
+            live=True,
+        )
+        self.argument = Argument.objects.create(
+            name="edited", character="pencil", chat_type=self.chat_type
+        )
+        CustomContentTemplate.objects.create(
+            name="alert",
+            search_string="^ALERT (.*)! (.*)",
+            chat_type=self.chat_type,
+            content_template="{1}",
+            argument_template="alert, alert-{0}",
+            kwarg_template={"alert-type": "{0}", "level": 2},
+            attachment_template={"title": "Alert!", "text": "{0}"},
+        )
+
+        self.plain = self.post(self.owner, "Hello *world*")
+        self.decorated = self.post(self.owner, "See [this](http://a.b/)")
+        Attachment.objects.create(
+            message=self.decorated,
+            title="A link",
+            title_link="http://a.b/",
+            image_url="http://a.b/c.png",
+            image_width=0,
+            image_height=10,
+        )
+        self.react(self.decorated, self.reader)
+        Reaction.objects.create(
+            message=self.decorated,
+            reaction="pencil",
+            argument=self.argument,
+            user=self.owner,
+            timestamp=self.tick(),
+        )
+        KeywordArgument.objects.create(
+            message=self.decorated,
+            key="style",
+            value="mod",
+            user=self.owner,
+            timestamp=self.tick(),
+        )
+        self.templated = self.post(self.owner, "ALERT red! All **clear**")
+        KeywordArgument.objects.create(
+            message=self.templated,
+            key="level",
+            value="3",
+            user=self.owner,
+            timestamp=self.tick(),
+        )
+        self.orphaned = self.post(self.deleted, "Gone but not forgotten")
+
+        # On commit, these would have been reserialized
+        for message in self.get_messages():
+            message.serialize()
+
+    def tick(self):
+        self.ticks += 1
+        return self.now + timedelta(seconds=self.ticks)
+
+    def react(self, message, user, reaction="fire"):
+        return Reaction.objects.create(
+            message=message,
+            reaction=reaction,
+            user=user,
+            timestamp=self.tick(),
+        )
+
+    def post(self, user, text):
+        return Message.objects.create(
+            channel=self.channel, user=user, text=text, timestamp=self.tick()
+        )
+
+    def get_messages(self):
+        """Messages loaded the way slackchat.reserialize loads them."""
+        return (
+            Message.objects.filter(channel=self.channel)
+            .select_related("user", "channel__chat_type")
+            .prefetch_related(
+                "reactions__user",
+                "reactions__argument",
+                "attachments",
+                "kwargs",
+            )
+            .order_by("timestamp")
+        )
+
+    def get_channel(self):
+        return Channel.objects.select_related("chat_type").get(
+            pk=self.channel.pk
+        )
@@ -1,8 +1,8 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from slackchat.serializers import ChannelCMSSerializer, ChannelSerializer
+from slackchat.serializers import ChannelCMSSerializer
 from slackchat.models import Channel, ChatType, User
-from slackchat.celery import post_webhook_republish, post_webhook_unpublish
+from slackchat.notifications import request_republish, request_unpublish
 from slackchat.authentication import TokenAPIAuthentication
 
 
@@ -52,13 +52,9 @@ class ChannelDeserializer(APIView):
 
     def handle_webhook(self, c):
         if c.published:
-            post_webhook_republish.delay(
-                ChannelSerializer(c).data, c.chat_type.name
-            )
+            request_republish(c)
         else:
-            post_webhook_unpublish.delay(
-                ChannelSerializer(c).data, c.chat_type.name
-            )
+            request_unpublish(c)
 
     def get(self, request, format=None):
         return Response(200)
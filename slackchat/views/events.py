@@ -5,15 +5,11 @@
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from slackchat.celery import process_event
 from slackchat.conf import settings
 from slackchat.utils import log_event
 
-from ..handlers import (
-    handle_message,
-    handle_message_removed,
-    handle_reaction_added,
-    handle_reaction_removed,
-)
+from ..handlers import handle_event
 
 
 class Events(APIView):
@@ -43,22 +39,11 @@ class Events(APIView):
             id = slack_message.get("event_id")
             event = slack_message.get("event")
 
-            if event.get("type") == "message":
-                if event.get("subtype", None) == "message_deleted":
-                    handle_message_removed(id, event)
-                elif (
-                    event.get("subtype", None) == "message_changed"
-                    and event.get("message", {}).get("subtype", None)
-                    == "tombstone"
-                ):
-                    handle_message_removed(id, event)
-                else:
-                    handle_message(id, event)
-
-            if event.get("type") == "reaction_added":
-                handle_reaction_added(id, event)
-
-            if event.get("type") == "reaction_removed":
-                handle_reaction_removed(id, event)
+            if settings.ASYNC_EVENTS:
+                # Acknowledge Slack right away and let a worker do the rest
+                process_event.delay(id, event)
+                log_event(200, "EVENT_QUEUED")
+            else:
+                handle_event(id, event)
 
         return Response(status=status.HTTP_200_OK)
@@ -1,11 +1,102 @@
-from rest_framework import viewsets
+import hashlib
+import math
+import time
 
+from django.db.models import Count, Max
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import (get_conditional_response, patch_cache_control,
+                                patch_vary_headers)
+from django.utils.http import http_date
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .changes import get_changes, get_cursor
+from .conf import settings
 from .models import Channel, ChatType
+from .renderers import get_renderer_classes
 from .serializers import (ChannelListSerializer, ChannelSerializer,
                           ChatTypeSerializer)
+from .snapshots import get_snapshot
+from .streaming import stream_channel
+
+
+def accepts_gzip(request):
+    """
+    Whether the request's Accept-Encoding allows gzip, which it doesn't
+    if it gives gzip, or failing that "*", a q-value of 0.
+    """
+    qualities = {}
+    for coding in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def make_etag(*parts):
+    key = ":".join(str(part) for part in parts)
+    return '"{}"'.format(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+
+class ConditionalMixin(object):
+    """Answers conditional GETs without running the serializer."""
+
+    def conditional(
+        self, request, etag, last_modified, max_age, get_response
+    ):
+        """
+        Return a 304 if the client's copy is current, otherwise the
+        response built by get_response. last_modified is in seconds
+        since the epoch.
+        """
+        if request.accepted_renderer.format != "json":
+            return get_response()
+
+        if last_modified is not None:
+            # HTTP dates are in whole seconds. Rounded up, and left out
+            # until that second is over, a later change always gets a
+            # later Last-Modified, so If-Modified-Since can't match it.
+            last_modified = math.ceil(last_modified)
+            if last_modified > time.time():
+                last_modified = None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = get_response()
+
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified)
+        patch_cache_control(response, public=True, max_age=max_age)
+        return response
+
+    def list_conditional(self, request, *args, **kwargs):
+        versions = self.get_queryset().aggregate(
+            modified=Max("modified"), count=Count("pk")
+        )
+        modified = versions["modified"]
+        return self.conditional(
+            request,
+            make_etag(request.get_full_path(), versions["count"], modified),
+            modified.timestamp() if modified else None,
+            self.max_age,
+            lambda: super(ConditionalMixin, self).list(
+                request, *args, **kwargs
+            ),
+        )
 
 
-class ChannelViewset(viewsets.ReadOnlyModelViewSet):
+class ChannelViewset(ConditionalMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Channel.objects.all()
     serializer_class = ChannelSerializer
     lookup_field = "pk"
@@ -13,6 +104,7 @@ class ChannelViewset(viewsets.ReadOnlyModelViewSet):
     permission_classes = []
     pagination_class = None
     throttle_classes = []
+    renderer_classes = get_renderer_classes()
 
     def get_serializer_class(self):
         if hasattr(self, "action") and self.action == "list":
@@ -20,17 +112,118 @@ class ChannelViewset(viewsets.ReadOnlyModelViewSet):
         return ChannelSerializer
 
     def get_queryset(self):
-        queryset = Channel.objects.all()
+        queryset = Channel.objects.select_related("chat_type")
         chat_type = self.request.query_params.get("chat_type", None)
         if chat_type:
             queryset = queryset.filter(chat_type__name=chat_type)
         return queryset
 
+    # Lists include live channels
+    max_age = settings.LIVE_MAX_AGE
 
-class ChatTypeViewset(viewsets.ReadOnlyModelViewSet):
+    def list(self, request, *args, **kwargs):
+        return self.list_conditional(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Serve the prebuilt payload unless another format was asked for
+        if request.accepted_renderer.format == "json":
+            snapshot = get_snapshot(kwargs[self.lookup_field])
+            if snapshot:
+                compressed = "gzip" in snapshot and accepts_gzip(request)
+                etag = snapshot["etag"]
+                if compressed:
+                    # Each encoding is its own representation
+                    etag = '{}-gzip"'.format(etag[:-1])
+                response = self.conditional(
+                    request,
+                    etag,
+                    snapshot["modified"],
+                    settings.LIVE_MAX_AGE
+                    if snapshot["live"]
+                    else settings.MAX_AGE,
+                    lambda: self.snapshot_response(snapshot, compressed),
+                )
+                patch_vary_headers(response, ("Accept-Encoding",))
+                return response
+        return super().retrieve(request, *args, **kwargs)
+
+    def snapshot_response(self, snapshot, compressed=False):
+        if snapshot.get("stream"):
+            return StreamingHttpResponse(
+                stream_channel(self.get_object()),
+                content_type="application/json",
+            )
+        if compressed:
+            response = HttpResponse(
+                snapshot["gzip"], content_type="application/json"
+            )
+            response["Content-Encoding"] = "gzip"
+            return response
+        return HttpResponse(snapshot["body"], content_type="application/json")
+
+    @action(detail=True)
+    def changes(self, request, pk=None):
+        """
+        Messages created, changed or deleted since the "since" cursor.
+
+        Without a cursor, returns only the current cursor, which a
+        renderer should fetch before loading the full channel.
+        """
+        channel = self.get_object()
+
+        since = request.query_params.get("since", None)
+        if since is None:
+            return Response(
+                {
+                    "cursor": get_cursor(channel.pk),
+                    "reset": False,
+                    "messages": [],
+                    "deleted": [],
+                }
+            )
+
+        try:
+            since = int(since)
+        except ValueError:
+            return Response(
+                {"detail": "since must be an integer cursor."},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(get_changes(channel.pk, since))
+
+
+class ChatTypeViewset(ConditionalMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ChatType.objects.all()
     serializer_class = ChatTypeSerializer
     authentication_classes = []
     permission_classes = []
     pagination_class = None
     throttle_classes = []
+    renderer_classes = get_renderer_classes()
+    max_age = settings.MAX_AGE
+
+    def list(self, request, *args, **kwargs):
+        return self.list_conditional(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            modified = (
+                ChatType.objects.filter(pk=kwargs["pk"])
+                .values_list("modified", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError):
+            modified = None
+        if modified is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        return self.conditional(
+            request,
+            make_etag("chat-type", kwargs["pk"], modified),
+            modified.timestamp(),
+            self.max_age,
+            lambda: super(ChatTypeViewset, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )